@@ -0,0 +1,192 @@
+"""Aim-bot benchmarks for Duck Hunt, reported as JSON.
+
+A scripted shooter plays real games: it leads a flying duck by its
+reaction time, aiming where the duck's current velocity will carry it,
+and fires a few ticks later. Sweeps duck count (classic mode's pair,
+then swarms), take-off speed range and tick rate, and reports:
+
+- headless simulation ticks per second and per-tick time percentiles;
+- frames per second, frame-time percentiles and Tk calls per frame
+  of the Tk game.
+
+    python bench_duckhunt.py --output bench.json
+
+The Tk benchmarks need a display; as in bench_numble.py a private
+Xvfb server is started when one is installed (see bench_util.display),
+otherwise they are skipped and the reason recorded in the report.
+"""
+import argparse
+import random
+import time
+import types
+from collections import deque
+from itertools import product
+
+from bench_util import display, result, write_report
+from duckhunt_core import SPEED_RANGE, TICK_SECONDS, DuckHuntSim, DuckSwarmSim, np
+from duckhunt_profiler import percentile
+
+DUCK_COUNTS = (2, 50, 300, 1000)  # 2 is classic mode
+SPEED_RANGES = (SPEED_RANGE, (4, 8), (8, 16))
+TICK_RATES = (round(1 / TICK_SECONDS), 60, 120)
+
+
+class AimBot:
+    """Scripted shooter leading the first flying duck by its reaction time"""
+    def __init__(self, reaction_ticks=3, cooldown_ticks=5):
+        self.reaction_ticks = reaction_ticks
+        self.cooldown_ticks = cooldown_ticks
+        self.pending = deque()  # (tick to fire on, x, y)
+        self.next_aim = 0
+        self.shots = 0
+        self.hits = 0
+
+    def update(self, sim, fire):
+        """Fire the shots that are due and aim the next; fire(x, y) shoots
+        and returns whether it hit"""
+        while self.pending and self.pending[0][0] <= sim.tick:
+            _, x, y = self.pending.popleft()
+            self.shots += 1
+            self.hits += bool(fire(x, y))
+        if not sim.game_active or sim.tick < self.next_aim:
+            return
+        for duck in sim.duck_snapshots():
+            if not duck.hit:
+                # Where the duck will be when the shot lands, if it flies straight
+                lead = self.reaction_ticks
+                x = duck.x + (duck.x - duck.prev_x) * lead
+                y = duck.y + (duck.y - duck.prev_y) * lead
+                self.pending.append((sim.tick + lead, round(x), round(y)))
+                self.next_aim = sim.tick + self.cooldown_ticks
+                break
+
+    def reset(self):
+        self.pending.clear()
+        self.next_aim = 0
+
+
+def make_sim(duck_count, speed_range, seed=0):
+    if duck_count <= 2:
+        sim = DuckHuntSim(rng=random.Random(seed))
+    else:
+        sim = DuckSwarmSim(rng=random.Random(seed), swarm_size=duck_count)
+    sim.speed_range = speed_range
+    return sim
+
+
+def percentiles(samples, scale, unit):
+    samples = sorted(samples)
+    summary = {f'p{p}_{unit}': percentile(samples, p) * scale for p in (50, 90, 99)}
+    summary[f'max_{unit}'] = samples[-1] * scale
+    return summary
+
+
+def configs(quick):
+    counts = DUCK_COUNTS if np is not None else DUCK_COUNTS[:1]
+    if quick:
+        return list(product(counts[:1] + counts[2:3], SPEED_RANGES[:1]))
+    return list(product(counts, SPEED_RANGES))
+
+
+def bench_sim(quick):
+    results = []
+    ticks = 2000 if quick else 20000
+    clock = time.perf_counter_ns
+    for duck_count, speed_range in configs(quick):
+        sim = make_sim(duck_count, speed_range)
+        bot = AimBot()
+        sim.start()
+        scores = []
+        tick_times = []
+        for _ in range(ticks):
+            start = clock()
+            sim.step()
+            bot.update(sim, sim.shoot)
+            tick_times.append(clock() - start)
+            if sim.game_over:
+                scores.append(sim.score)
+                bot.reset()
+                sim.reset()
+                sim.start()
+
+        seconds = sum(tick_times) / 1e9
+        entry = result('sim_tick', seconds, ticks, duck_count=duck_count, speed_range=list(speed_range))
+        entry.update(percentiles(tick_times, 1e-3, 'us'))
+        # How many times faster than real time the game could run
+        entry['realtime_factor'] = {str(rate): round(ticks / seconds / rate, 1) for rate in TICK_RATES}
+        entry['games_finished'] = len(scores)
+        entry['bot_shots'] = bot.shots
+        entry['bot_hit_rate'] = bot.hits / bot.shots if bot.shots else None
+        results.append(entry)
+    return results
+
+
+def bench_tk(quick):
+    with display() as problem:
+        if problem is None:
+            try:
+                return _bench_tk(quick)
+            except Exception as e:  # tkinter missing or the display refused us
+                problem = f"Tk unavailable: {e}"
+        return [{'name': 'tk_frame', 'skipped': problem}]
+
+
+def _bench_tk(quick):
+    import tkinter as tk
+    from duckhunt import DuckHuntGame
+
+    results = []
+    frames = 200 if quick else 1000
+    root = tk.Tk()
+    game = DuckHuntGame(root, recordings_dir=None)
+    game.running = False  # frames are driven below, as fast as Tk will draw them
+    root.update()
+
+    tick_rates = TICK_RATES[:1] if quick else TICK_RATES
+    for (duck_count, speed_range), tick_rate in product(configs(quick), tick_rates):
+        game.sim = make_sim(duck_count, speed_range)
+        game.tick_seconds = 1 / tick_rate
+        game.reset_game()
+        bot = AimBot()
+
+        def fire(x, y):
+            score = game.sim.score
+            game.shoot(types.SimpleNamespace(x=x, y=y))
+            return game.sim.score > score
+
+        frame_times = []
+        tk_calls = 0
+        for frame in range(frames):
+            start = time.perf_counter()
+            game.update_crosshair(types.SimpleNamespace(x=frame % game.width, y=frame % game.height))
+            bot.update(game.sim, fire)
+            game.game_loop()
+            root.update()
+            frame_times.append(time.perf_counter() - start)
+            tk_calls += game.frame_tk_calls
+            if game.sim.game_over:
+                bot.reset()
+                game.reset_game()
+
+        entry = result('tk_frame', sum(frame_times), frames, duck_count=duck_count,
+                       speed_range=list(speed_range), tick_rate=tick_rate)
+        entry.update(percentiles(frame_times, 1e3, 'ms'))
+        entry['tk_calls_per_frame'] = tk_calls / frames
+        results.append(entry)
+    root.destroy()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Duck Hunt with a scripted shooter")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--quick', action='store_true', help="smaller sweep, for smoke runs")
+    parser.add_argument('--only', nargs='+', choices=('sim', 'tk'), default=['sim', 'tk'])
+    args = parser.parse_args(argv)
+
+    suites = {'sim': bench_sim, 'tk': bench_tk}
+    write_report([entry for name in args.only for entry in suites[name](args.quick)], args.output)
+
+
+if __name__ == "__main__":
+    main()
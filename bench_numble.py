@@ -0,0 +1,151 @@
+"""Benchmarks for Numble's hot paths, reported as JSON.
+
+Covers feedback scoring (scalar and batch) per digit count and
+repeat mode, solver suggestions, and the Tk paths: appending to and
+re-rendering the guess history as it grows, and reset_game including
+the teardown of the win screen in result_frame.
+
+    python bench_numble.py --output bench.json
+
+The Tk benchmarks need a display. Without one, a private Xvfb server
+is started when `Xvfb` is installed (see bench_util.display);
+otherwise they are skipped and the reason is recorded in the report.
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from itertools import product
+
+from bench_util import display, measure, result, write_report
+from numble_engine import MAX_DIGITS, MIN_DIGITS, NumbleEngine, all_digits, all_numbers, np, score_guess
+
+HISTORY_SIZES = (10, 100, 500, 1000)
+
+
+def bench_feedback(quick):
+    results = []
+    for digit_count, allow_repeating_digits in product(range(MIN_DIGITS, MAX_DIGITS + 1), (False, True)):
+        params = {'digit_count': digit_count, 'allow_repeating_digits': allow_repeating_digits}
+        numbers = all_numbers(digit_count, allow_repeating_digits)
+        pairs = [(numbers[i * 7919 % len(numbers)], numbers[i * 104729 % len(numbers)]) for i in range(1000)]
+
+        def score_pairs():
+            for guess, target in pairs:
+                score_guess(guess, target)
+        results.append(result('score_guess', measure(score_pairs), len(pairs), **params))
+
+        engine = NumbleEngine(digit_count, allow_repeating_digits)
+        engine.new_game()
+        guesses = [guess for guess, _ in pairs]
+
+        def calculate_feedback():
+            for guess in guesses:
+                engine.calculate_feedback(guess)
+        results.append(result('calculate_feedback', measure(calculate_feedback), len(guesses), **params))
+
+        if np is not None and not (quick and len(numbers) > 100000):
+            targets = all_digits(digit_count, allow_repeating_digits)
+            seconds = measure(lambda: engine.calculate_feedback_batch(guesses[0], targets), repeat=3)
+            results.append(result('score_batch', seconds, len(targets), **params))
+    return results
+
+
+def bench_solver(quick):
+    if np is None:
+        return [{'name': 'solver_suggest', 'skipped': "numpy is not installed"}]
+    from numble_solver import NumbleSolver
+
+    results = []
+    digit_counts = (4,) if quick else range(MIN_DIGITS, MAX_DIGITS + 1)
+    for digit_count, allow_repeating_digits in product(digit_counts, (False, True)):
+        for difficulty_mode in ("easy", "standard", "hard"):
+            solver = NumbleSolver(digit_count, allow_repeating_digits, difficulty_mode, seed=0)
+            seconds = measure(solver.suggest, repeat=3)
+            results.append(result('solver_suggest', seconds, digit_count=digit_count,
+                                  allow_repeating_digits=allow_repeating_digits,
+                                  difficulty_mode=difficulty_mode))
+    return results
+
+
+def bench_tk(quick):
+    with display() as problem:
+        if problem is None:
+            try:
+                return _bench_tk(quick)
+            except Exception as e:  # tkinter missing or the display refused us
+                problem = f"Tk unavailable: {e}"
+        return [{'name': name, 'skipped': problem}
+                for name in ('append_history_entry', 'update_history_display', 'reset_game')]
+
+
+def _bench_tk(quick):
+    import tkinter as tk
+    from numble import NumbleGame
+
+    results = []
+    root = tk.Tk()
+    with tempfile.TemporaryDirectory() as data_dir, contextlib.redirect_stdout(io.StringIO()):
+        game = NumbleGame(root, data_dir=data_dir)
+        root.update()
+
+        def flush():
+            root.update_idletasks()
+
+        for size in HISTORY_SIZES[:2] if quick else HISTORY_SIZES:
+            game.reset_game()
+            # Never guess the target, so the game runs as long as needed
+            numbers = [n for n in all_numbers(game.digit_count, False) if n != game.target_number]
+            for guess in numbers[:size]:
+                game.engine.submit_guess(guess)
+            game.update_history_display()
+            flush()
+
+            # Appending the next guesses one at a time
+            extra = numbers[size:size + 50]
+            start = time.perf_counter()
+            for guess in extra:
+                game.engine.submit_guess(guess)
+                game.append_history_entry()
+                flush()
+            results.append(result('append_history_entry', time.perf_counter() - start, len(extra),
+                                   history_size=size))
+
+            # Re-rendering everything, alternating display modes as a toggle does
+            def toggle():
+                game.show_symbol_positions = not game.show_symbol_positions
+                game.update_history_display()
+                flush()
+            results.append(result('update_history_display', measure(toggle, repeat=3),
+                                  history_size=size + len(extra)))
+
+        def reset_after_win():
+            game.engine.submit_guess(game.target_number)
+            game.show_win_screen()
+            flush()
+            start = time.perf_counter()
+            game.reset_game()
+            flush()
+            return time.perf_counter() - start
+
+        samples = sorted(reset_after_win() for _ in range(50))
+        results.append(result('reset_game', samples[len(samples) // 2], with_win_screen=True))
+    root.destroy()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Numble's hot paths")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--quick', action='store_true', help="smaller sweep, for smoke runs")
+    parser.add_argument('--only', nargs='+', choices=('feedback', 'solver', 'tk'),
+                        default=['feedback', 'solver', 'tk'])
+    args = parser.parse_args(argv)
+
+    suites = {'feedback': bench_feedback, 'solver': bench_solver, 'tk': bench_tk}
+    write_report([entry for name in args.only for entry in suites[name](args.quick)], args.output)
+
+
+if __name__ == "__main__":
+    main()
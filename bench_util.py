@@ -0,0 +1,98 @@
+"""Helpers shared by the benchmark scripts (bench_numble.py, bench_duckhunt.py).
+
+Timing, result entries, a display for the Tk benchmarks and the JSON
+report every benchmark writes.
+"""
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # only reported
+    np = None
+
+
+def measure(func, min_time=0.2, repeat=5):
+    """Seconds per call of func(): the best of `repeat` timed batches"""
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat:
+            break
+        calls *= 2
+    best = elapsed / calls
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def result(name, seconds, per=1, **params):
+    return {
+        'name': name,
+        'params': params,
+        'seconds_per_op': seconds / per,
+        'ops_per_second': per / seconds
+    }
+
+
+@contextlib.contextmanager
+def display():
+    """Yield None when Tk can open a window, or the reason it cannot
+
+    Without a display, a private Xvfb server is started on a free display
+    number when `Xvfb` is installed.
+    """
+    if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        yield None
+        return
+    xvfb = shutil.which('Xvfb')
+    if not xvfb:
+        yield "no display and Xvfb is not installed"
+        return
+
+    # Xvfb picks a free display and writes its number once it is ready,
+    # so benchmarks running side by side each get their own
+    read_fd, write_fd = os.pipe()
+    server = subprocess.Popen([xvfb, '-displayfd', str(write_fd), '-screen', '0', '1024x768x24', '-nolisten', 'tcp'],
+                              pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        number = f.readline().strip()  # empty if the server exited instead
+    if number:
+        os.environ['DISPLAY'] = f":{number}"
+    try:
+        yield None if number else "Xvfb failed to start"
+    finally:
+        os.environ.pop('DISPLAY', None)
+        server.terminate()
+        server.wait()
+
+
+def write_report(results, output=None):
+    """Write results with the environment they were measured in, as JSON to
+    the output path or stdout"""
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__ if np is not None else None,
+        'timestamp': time.time(),
+        'results': results
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
@@ -1,139 +1,179 @@
+import argparse
 import tkinter as tk
-import random
-import math
+import time
+from collections import deque
 
-class Duck:
-    def __init__(self, canvas, width, height):
+from duckhunt_core import DUCK_SIZE, HEIGHT, TICK_SECONDS, WIDTH, DuckHuntSim, DuckSwarmSim, np
+from duckhunt_profiler import Profiler
+from duckhunt_replay import DEFAULT_RECORDINGS_DIR, start_recording, write_recording
+
+# Render as often as Tk allows, but don't spin
+FRAME_MS = 10
+# Steps simulated per frame at most; beyond that the game slows down
+# rather than spiralling
+MAX_CATCH_UP_STEPS = 5
+# How often the profiler overlay redraws
+OVERLAY_MS = 250
+
+class DuckSprite:
+    """Canvas items drawing one duck of the simulation
+
+    Sprites are pooled: a duck that leaves hides its sprite for the next
+    duck to reuse, instead of deleting and recreating canvas items.
+    """
+    count = 0
+    
+    def __init__(self, canvas, size=DUCK_SIZE):
         self.canvas = canvas
-        self.width = width
-        self.height = height
-        self.size = 40
-        self.x = random.randint(50, width - 50)
-        self.y = height - 100
-        self.speed = random.uniform(2, 4)
-        self.angle = random.uniform(30, 150)
-        self.vx = self.speed * math.cos(math.radians(self.angle))
-        self.vy = -self.speed * math.sin(math.radians(self.angle))
-        self.alive = True
-        self.hit = False
-        self.fall_speed = 0
+        self.size = size
+        # One tag addresses all three items in a single Tk call
+        DuckSprite.count += 1
+        self.tag = f"duck{DuckSprite.count}"
         
-        # Draw duck (simple shape)
+        # Draw duck (simple shape), hidden until shown
         self.body = canvas.create_oval(
-            self.x - self.size//2, self.y - self.size//2,
-            self.x + self.size//2, self.y + self.size//2,
-            fill='brown', outline='black', width=2
+            0, 0, 0, 0, fill='brown', outline='black', width=2,
+            state='hidden', tags=(self.tag,)
         )
         self.head = canvas.create_oval(
-            self.x + self.size//4, self.y - self.size//2 - 10,
-            self.x + self.size//2 + 5, self.y - self.size//4,
-            fill='darkgreen', outline='black', width=2
+            0, 0, 0, 0, fill='darkgreen', outline='black', width=2,
+            state='hidden', tags=(self.tag,)
         )
         self.wing = canvas.create_polygon(
-            self.x - self.size//2, self.y,
-            self.x - self.size - 10, self.y - 5,
-            self.x - self.size//2, self.y + 10,
-            fill='brown', outline='black', width=2
+            0, 0, 0, 0, 0, 0, fill='brown', outline='black', width=2,
+            state='hidden', tags=(self.tag,)
         )
-        
-    def move(self):
-        if self.hit:
-            # Duck is falling
-            self.fall_speed += 0.5
-            self.y += self.fall_speed
-            if self.y > self.height:
-                self.alive = False
-        else:
-            # Normal flight
-            self.x += self.vx
-            self.y += self.vy
-            
-            # Bounce off walls
-            if self.x <= self.size or self.x >= self.width - self.size:
-                self.vx = -self.vx
-            if self.y <= self.size:
-                self.vy = -self.vy
-                
-            # Escape if duck reaches top
-            if self.y < -50:
-                self.alive = False
-        
-        # Update duck position
+        self.hit = False
+    
+    def draw(self, x, y):
         self.canvas.coords(self.body,
-            self.x - self.size//2, self.y - self.size//2,
-            self.x + self.size//2, self.y + self.size//2
+            x - self.size//2, y - self.size//2,
+            x + self.size//2, y + self.size//2
         )
         self.canvas.coords(self.head,
-            self.x + self.size//4, self.y - self.size//2 - 10,
-            self.x + self.size//2 + 5, self.y - self.size//4
+            x + self.size//4, y - self.size//2 - 10,
+            x + self.size//2 + 5, y - self.size//4
         )
         self.canvas.coords(self.wing,
-            self.x - self.size//2, self.y,
-            self.x - self.size - 10, self.y - 5,
-            self.x - self.size//2, self.y + 10
+            x - self.size//2, y,
+            x - self.size - 10, y - 5,
+            x - self.size//2, y + 10
         )
-        
-    def check_hit(self, click_x, click_y):
-        # Check if click is within duck's bounds
-        distance = math.sqrt((click_x - self.x)**2 + (click_y - self.y)**2)
-        if distance <= self.size and not self.hit:
-            self.hit = True
-            self.canvas.itemconfig(self.body, fill='red')
-            return True
-        return False
     
-    def remove(self):
-        self.canvas.delete(self.body)
-        self.canvas.delete(self.head)
-        self.canvas.delete(self.wing)
+    def show(self, x, y):
+        self.draw(x, y)
+        self.canvas.itemconfig(self.tag, state='normal')
+    
+    def mark_hit(self):
+        self.hit = True
+        self.canvas.itemconfig(self.body, fill='red')
+    
+    def hide(self):
+        self.canvas.itemconfig(self.tag, state='hidden')
+        if self.hit:
+            self.hit = False
+            self.canvas.itemconfig(self.body, fill='brown')
+
+class Hud:
+    """Retained-mode HUD text
+
+    Each field remembers the value its canvas item shows. Setting a
+    field only marks it dirty when the value changed; flush() formats
+    and pushes the dirty fields, once per frame.
+    """
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.fields = {}  # name -> (canvas item, text template)
+        self.values = {}  # name -> values on screen
+        self.dirty = {}   # name -> values to push
+    
+    def add(self, name, x, y, template, *values, **options):
+        item = self.canvas.create_text(
+            x, y, text=template.format(*values), fill='white', anchor='nw', **options
+        )
+        self.fields[name] = (item, template)
+        self.values[name] = values
+    
+    def set(self, name, *values):
+        if values != self.values[name]:
+            self.dirty[name] = values
+        else:
+            self.dirty.pop(name, None)
+    
+    def flush(self):
+        for name, values in self.dirty.items():
+            item, template = self.fields[name]
+            self.canvas.itemconfig(item, text=template.format(*values))
+            self.values[name] = values
+        self.dirty.clear()
+
+class TkCallCounter:
+    """Stands in for a widget's Tcl interpreter, counting the calls made through it"""
+    def __init__(self, interp):
+        self.interp = interp
+        self.calls = 0
+    
+    def call(self, *args):
+        self.calls += 1
+        return self.interp.call(*args)
+    
+    def __getattr__(self, name):
+        return getattr(self.interp, name)
 
 class DuckHuntGame:
-    def __init__(self, root):
+    def __init__(self, root, recordings_dir=DEFAULT_RECORDINGS_DIR, profiler=None):
         self.root = root
         self.root.title("Duck Hunt")
-        self.width = 800
-        self.height = 600
+        self.width = WIDTH
+        self.height = HEIGHT
         
-        # Game state
-        self.score = 0
-        self.round = 1
-        self.ducks_per_round = 10
-        self.ducks_shot = 0
-        self.ducks_missed = 0
-        self.shots = 3
-        self.ducks = []
-        self.game_active = False
+        # Game state lives in the headless simulation; this class only
+        # draws its snapshots and feeds it input
+        self.sim = DuckHuntSim(self.width, self.height)
+        self.tick_seconds = TICK_SECONDS
+        self.sprites = {}  # duck id -> DuckSprite
+        self.spare_sprites = []  # hidden, ready for the next duck
+        self.game_over_shown = False
+        # Every finished game is saved for replay; None turns that off
+        self.recordings_dir = recordings_dir
+        self.recorder = None
+        snapshot = self.sim.snapshot()
         
         # Create canvas
         self.canvas = tk.Canvas(root, width=self.width, height=self.height, bg='skyblue', cursor='none')
         self.canvas.pack()
+        # Count every Tk call the canvas makes, to measure drawing cost per frame
+        self.tk_calls = self.canvas.tk = TkCallCounter(self.canvas.tk)
+        self.frame_tk_calls = 0
+        self.frame_calls_start = 0
         
         # Draw ground
         self.canvas.create_rectangle(0, self.height - 80, self.width, self.height, fill='green', outline='darkgreen')
         self.canvas.create_rectangle(0, self.height - 100, self.width, self.height - 80, fill='brown')
         
         # Score display
-        self.score_text = self.canvas.create_text(
-            10, 10, text=f"Score: {self.score}", 
-            font=('Arial', 16, 'bold'), fill='white', anchor='nw'
-        )
-        self.round_text = self.canvas.create_text(
-            10, 35, text=f"Round: {self.round}", 
-            font=('Arial', 14), fill='white', anchor='nw'
-        )
-        self.shots_text = self.canvas.create_text(
-            10, 60, text=f"Shots: {self.shots}", 
-            font=('Arial', 14), fill='white', anchor='nw'
-        )
-        self.duck_text = self.canvas.create_text(
-            10, 85, text=f"Ducks: {self.ducks_shot}/{self.ducks_per_round}", 
-            font=('Arial', 14), fill='white', anchor='nw'
-        )
+        self.hud = Hud(self.canvas)
+        self.hud.add('score', 10, 10, "Score: {}", snapshot.score, font=('Arial', 16, 'bold'))
+        self.hud.add('round', 10, 35, "Round: {}", snapshot.round, font=('Arial', 14))
+        self.hud.add('shots', 10, 60, "Shots: {}", snapshot.shots, font=('Arial', 14))
+        self.hud.add('ducks', 10, 85, "Ducks: {}/{}", snapshot.ducks_shot, snapshot.ducks_per_round,
+                     font=('Arial', 14))
         
-        # Crosshair (cursor)
-        self.crosshair_h = self.canvas.create_line(0, 0, 0, 0, fill='red', width=2)
-        self.crosshair_v = self.canvas.create_line(0, 0, 0, 0, fill='red', width=2)
-        self.crosshair_circle = self.canvas.create_oval(0, 0, 0, 0, outline='red', width=2)
+        # Crosshair (cursor): one tagged group, moved as a unit. It starts
+        # off-canvas until the pointer first moves.
+        size = 15
+        self.crosshair_at = (-size * 2, -size * 2)
+        x, y = self.crosshair_at
+        self.canvas.create_line(x - size, y, x + size, y, fill='red', width=2, tags=('crosshair',))
+        self.canvas.create_line(x, y - size, x, y + size, fill='red', width=2, tags=('crosshair',))
+        self.canvas.create_oval(x - size, y - size, x + size, y + size, outline='red', width=2,
+                                tags=('crosshair',))
+        self.pointer = None  # latest pointer position not drawn yet
+        
+        self.game_over_text = self.canvas.create_text(
+            self.width // 2, self.height // 2,
+            font=('Arial', 32, 'bold'), fill='red', state='hidden'
+        )
         
         # Start button
         self.start_button = tk.Button(
@@ -142,144 +182,231 @@ class DuckHuntGame:
         )
         self.start_button.place(relx=0.5, rely=0.5, anchor='center')
         
+        # Swarm mode needs numpy for its array-backed flock
+        self.mode_button = tk.Button(
+            root, text="Swarm Mode", font=('Arial', 12, 'bold'),
+            command=self.switch_mode, bg='orange', fg='white',
+            state='normal' if np is not None else 'disabled'
+        )
+        self.mode_button.place(relx=0.5, rely=0.58, anchor='center')
+        
+        # Profiling is opt-in: time each phase of a frame, before any of
+        # them is handed to Tk as a callback
+        self.profiler = profiler
+        self.overlay_text = self.canvas.create_text(
+            self.width - 10, 10, font=('Courier', 11), fill='white', anchor='ne', state='hidden'
+        )
+        self.overlay_shown = False
+        self.overlay_due = 0.0
+        if profiler:
+            profiler.instrument(self, 'game_loop', 'simulate', 'render', 'shoot',
+                                'update_crosshair', 'draw_crosshair')
+            profiler.instrument(self.hud, 'flush')
+            self.root.bind('<F3>', self.toggle_overlay)
+            self.root.bind('<F4>', self.export_trace)
+        
         # Bind events
         self.canvas.bind('<Motion>', self.update_crosshair)
         self.canvas.bind('<Button-1>', self.shoot)
         
+        # Frame timing
+        self.last_frame = time.perf_counter()
+        self.accumulator = 0.0
+        self.frame_time = 0.0
+        self.frame_stamps = deque()  # frame times within the last second
+        self.tick_stamps = deque()   # step times within the last second
+        
         self.running = True
         self.game_loop()
         
     def update_crosshair(self, event):
-        x, y = event.x, event.y
-        size = 15
-        
-        # Update crosshair lines
-        self.canvas.coords(self.crosshair_h, x - size, y, x + size, y)
-        self.canvas.coords(self.crosshair_v, x, y - size, x, y + size)
-        self.canvas.coords(self.crosshair_circle, x - size, y - size, x + size, y + size)
+        # Only remember the position; game_loop draws the latest one
+        self.pointer = (event.x, event.y)
+    
+    def draw_crosshair(self):
+        if self.pointer is None:
+            return
+        x, y = self.pointer
+        self.pointer = None
+        self.canvas.move('crosshair', x - self.crosshair_at[0], y - self.crosshair_at[1])
+        self.crosshair_at = (x, y)
+        if self.sim.game_active:
+            self.recorder.motion(x, y)
         
     def shoot(self, event):
-        if not self.game_active or self.shots <= 0:
+        if not self.sim.game_active or self.sim.shots <= 0:
             return
-            
-        self.shots -= 1
-        self.update_display()
         
-        # Check if any duck was hit
-        hit = False
-        for duck in self.ducks:
-            if not duck.hit and duck.check_hit(event.x, event.y):
-                hit = True
-                self.score += 100
-                self.ducks_shot += 1
-                break
+        self.recorder.shot(event.x, event.y)
+        hit = self.sim.shoot(event.x, event.y)
         
         # Flash effect
         if hit:
             self.canvas.config(bg='white')
             self.root.after(50, lambda: self.canvas.config(bg='skyblue'))
-        
-        self.update_display()
-        
-        # Check if out of shots
-        if self.shots <= 0:
-            self.end_wave()
     
     def start_game(self):
         self.start_button.place_forget()
-        self.game_active = True
-        self.spawn_duck()
-        
-    def spawn_duck(self):
-        if len(self.ducks) < 2 and (self.ducks_shot + self.ducks_missed) < self.ducks_per_round:
-            duck = Duck(self.canvas, self.width, self.height)
-            self.ducks.append(duck)
-            self.shots = 3
-            self.update_display()
+        self.mode_button.place_forget()
+        self.recorder = start_recording(self.sim)
     
-    def end_wave(self):
-        # Clear all ducks
-        for duck in self.ducks:
-            duck.remove()
-        self.ducks.clear()
-        
-        # Check progress
-        if self.ducks_shot >= self.ducks_per_round * 0.6:  # Need 60% accuracy
-            self.round += 1
-            self.ducks_shot = 0
-            self.ducks_missed = 0
-            self.game_active = True
-            self.root.after(1000, self.spawn_duck)
-        else:
-            self.game_over()
-        
-        self.update_display()
+    def switch_mode(self):
+        """Start over in the other mode: classic ducks or swarm"""
+        sim_class = DuckHuntSim if isinstance(self.sim, DuckSwarmSim) else DuckSwarmSim
+        self.sim = sim_class(self.width, self.height)
+        self.reset_game()
     
     def game_over(self):
-        self.game_active = False
-        self.canvas.create_text(
-            self.width // 2, self.height // 2,
-            text=f"Game Over!\nFinal Score: {self.score}",
-            font=('Arial', 32, 'bold'), fill='red'
+        self.game_over_shown = True
+        self.save_recording()
+        self.canvas.itemconfig(
+            self.game_over_text, state='normal',
+            text=f"Game Over!\nFinal Score: {self.sim.score}"
         )
         self.start_button.config(text="Play Again", command=self.reset_game)
         self.start_button.place(relx=0.5, rely=0.6, anchor='center')
+        swarm = isinstance(self.sim, DuckSwarmSim)
+        self.mode_button.config(text="Classic Mode" if swarm else "Swarm Mode")
+        self.mode_button.place(relx=0.5, rely=0.68, anchor='center')
+    
+    def save_recording(self):
+        if self.recordings_dir is None:
+            return
+        try:
+            write_recording(self.recorder.recording(), self.recordings_dir,
+                            f"{time.strftime('%Y%m%d-%H%M%S')}-{self.sim.seed:016x}")
+        except OSError as e:
+            print(f"Could not save recording: {e}")
     
     def reset_game(self):
-        self.score = 0
-        self.round = 1
-        self.ducks_shot = 0
-        self.ducks_missed = 0
-        self.shots = 3
-        for duck in self.ducks:
-            duck.remove()
-        self.ducks.clear()
-        self.canvas.delete('all')
-        
-        # Redraw static elements
-        self.canvas.create_rectangle(0, self.height - 80, self.width, self.height, fill='green', outline='darkgreen')
-        self.canvas.create_rectangle(0, self.height - 100, self.width, self.height - 80, fill='brown')
+        """Start over, reusing the scenery and every canvas item"""
+        self.sim.reset()
+        for sprite in self.sprites.values():
+            self.release_sprite(sprite)
+        self.sprites.clear()
+        self.game_over_shown = False
+        self.canvas.itemconfig(self.game_over_text, state='hidden')
+        self.update_display(self.sim.snapshot())
+        self.start_game()
+    
+    def acquire_sprite(self, x, y):
+        sprite = self.spare_sprites.pop() if self.spare_sprites else DuckSprite(self.canvas)
+        sprite.show(x, y)
+        return sprite
+    
+    def release_sprite(self, sprite):
+        sprite.hide()
+        self.spare_sprites.append(sprite)
+    
+    def update_display(self, snapshot):
+        """Mark changed HUD fields; game_loop pushes them once per frame"""
+        self.hud.set('score', snapshot.score)
+        self.hud.set('round', snapshot.round)
+        self.hud.set('shots', snapshot.shots)
+        self.hud.set('ducks', snapshot.ducks_shot, snapshot.ducks_per_round)
+    
+    def render(self, alpha=1.0):
+        """Draw the simulation's latest snapshot, alpha of the way into its last step"""
+        snapshot = self.sim.snapshot()
         
-        self.score_text = self.canvas.create_text(10, 10, text=f"Score: {self.score}", font=('Arial', 16, 'bold'), fill='white', anchor='nw')
-        self.round_text = self.canvas.create_text(10, 35, text=f"Round: {self.round}", font=('Arial', 14), fill='white', anchor='nw')
-        self.shots_text = self.canvas.create_text(10, 60, text=f"Shots: {self.shots}", font=('Arial', 14), fill='white', anchor='nw')
-        self.duck_text = self.canvas.create_text(10, 85, text=f"Ducks: {self.ducks_shot}/{self.ducks_per_round}", font=('Arial', 14), fill='white', anchor='nw')
+        # Sprites for ducks that appeared, gone for ducks that left
+        live_ids = set()
+        for duck in snapshot.ducks:
+            live_ids.add(duck.id)
+            x = duck.prev_x + (duck.x - duck.prev_x) * alpha
+            y = duck.prev_y + (duck.y - duck.prev_y) * alpha
+            sprite = self.sprites.get(duck.id)
+            if sprite is None:
+                sprite = self.sprites[duck.id] = self.acquire_sprite(x, y)
+            else:
+                sprite.draw(x, y)
+            if duck.hit and not sprite.hit:
+                sprite.mark_hit()
+        for duck_id in [duck_id for duck_id in self.sprites if duck_id not in live_ids]:
+            self.release_sprite(self.sprites.pop(duck_id))
         
-        self.crosshair_h = self.canvas.create_line(0, 0, 0, 0, fill='red', width=2)
-        self.crosshair_v = self.canvas.create_line(0, 0, 0, 0, fill='red', width=2)
-        self.crosshair_circle = self.canvas.create_oval(0, 0, 0, 0, outline='red', width=2)
+        self.update_display(snapshot)
         
-        self.start_game()
-    
-    def update_display(self):
-        self.canvas.itemconfig(self.score_text, text=f"Score: {self.score}")
-        self.canvas.itemconfig(self.round_text, text=f"Round: {self.round}")
-        self.canvas.itemconfig(self.shots_text, text=f"Shots: {self.shots}")
-        self.canvas.itemconfig(self.duck_text, text=f"Ducks: {self.ducks_shot}/{self.ducks_per_round}")
+        if snapshot.game_over and not self.game_over_shown:
+            self.game_over()
     
     def game_loop(self):
-        if self.game_active:
-            # Move all ducks
-            for duck in self.ducks[:]:
-                duck.move()
-                if not duck.alive:
-                    if not duck.hit:
-                        self.ducks_missed += 1
-                    duck.remove()
-                    self.ducks.remove(duck)
-                    
-                    # Spawn next duck if available
-                    if (self.ducks_shot + self.ducks_missed) < self.ducks_per_round:
-                        self.spawn_duck()
-                    elif len(self.ducks) == 0:
-                        self.end_wave()
-            
-            self.update_display()
+        now = time.perf_counter()
+        self.frame_time = now - self.last_frame
+        self.last_frame = now
+        
+        self.simulate(now)
+        
+        # Draw ducks part of the way into the next step
+        if self.sim.game_active or self.sprites or (self.sim.game_over and not self.game_over_shown):
+            self.render(self.accumulator / self.tick_seconds)
+        self.hud.flush()
+        self.draw_crosshair()
+        
+        # Calls since the last frame, input handlers included
+        self.frame_tk_calls = self.tk_calls.calls - self.frame_calls_start
+        self.frame_calls_start = self.tk_calls.calls
+        
+        self.frame_stamps.append(now)
+        for stamps in (self.frame_stamps, self.tick_stamps):
+            while stamps and stamps[0] <= now - 1.0:
+                stamps.popleft()
+        
+        if self.profiler:
+            self.profiler.frame(self.frame_time, time.perf_counter() - now, self.frame_tk_calls)
+            if self.overlay_shown and now >= self.overlay_due:
+                self.overlay_due = now + OVERLAY_MS / 1000
+                self.update_overlay()
         
         if self.running:
-            self.root.after(30, self.game_loop)
+            self.root.after(FRAME_MS, self.game_loop)
+    
+    def simulate(self, now):
+        """Run every step that is due, up to the catch-up cap"""
+        self.accumulator = min(self.accumulator + self.frame_time, MAX_CATCH_UP_STEPS * self.tick_seconds)
+        while self.accumulator >= self.tick_seconds:
+            self.sim.step()
+            self.accumulator -= self.tick_seconds
+            self.tick_stamps.append(now)
+    
+    def toggle_overlay(self, event=None):
+        self.overlay_shown = not self.overlay_shown
+        self.overlay_due = 0.0
+        self.canvas.itemconfig(self.overlay_text, state='normal' if self.overlay_shown else 'hidden')
+    
+    def update_overlay(self):
+        summary = self.profiler.summary()
+        if not summary['frames']:
+            return
+        self.canvas.itemconfig(self.overlay_text, text=(
+            f"FPS {self.fps}  ticks/s {self.tick_rate}\n"
+            f"frame p50 {summary['frame_p50']:5.1f} ms  p99 {summary['frame_p99']:5.1f} ms\n"
+            f"work  p50 {summary['work_p50']:5.1f} ms  p99 {summary['work_p99']:5.1f} ms\n"
+            f"Tk calls {self.frame_tk_calls}  p99 {summary['tk_calls_p99']}"
+        ))
+    
+    def export_trace(self, event=None):
+        try:
+            print(f"Trace written to {self.profiler.export()}")
+        except OSError as e:
+            print(f"Could not write trace: {e}")
+    
+    @property
+    def fps(self):
+        """Frames rendered over the last second"""
+        return len(self.frame_stamps)
+    
+    @property
+    def tick_rate(self):
+        """Simulation steps run over the last second"""
+        return len(self.tick_stamps)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Duck Hunt")
+    parser.add_argument('--profile', action='store_true',
+                        help="time each frame; F3 toggles the overlay, F4 exports a trace")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    game = DuckHuntGame(root)
+    game = DuckHuntGame(root, profiler=Profiler() if args.profile else None)
     root.mainloop()
\ No newline at end of file
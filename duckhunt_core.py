@@ -0,0 +1,510 @@
+"""Headless Duck Hunt simulation.
+
+Duck physics and the rules of a game (shots, scoring, waves, rounds)
+with no tkinter anywhere, advanced one fixed step at a time. The Tk game
+in duckhunt.py drives a `DuckHuntSim` from its frame loop and draws the
+snapshots it produces; the same simulation runs headlessly, as fast as
+the CPU allows, for balancing and regression tests.
+
+Swarm mode (`DuckSwarmSim`) launches a whole round's flock at once and
+keeps it in a `DuckSwarm`: flat arrays of positions, velocities and
+flags moved with a handful of numpy operations per step, so hundreds of
+ducks cost about as much as a few.
+"""
+import math
+import random
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # swarm mode is optional
+    np = None
+
+WIDTH = 800
+HEIGHT = 600
+DUCK_SIZE = 40
+
+# One simulation step; duck speeds are per step
+TICK_SECONDS = 0.03
+# Pause between a cleared wave and the next duck
+WAVE_DELAY_TICKS = round(1.0 / TICK_SECONDS)
+
+SPEED_RANGE = (2, 4)  # take-off speed, pixels per step
+
+SHOTS_PER_DUCK = 3
+DUCKS_PER_ROUND = 10
+MAX_DUCKS_IN_FLIGHT = 2
+HIT_SCORE = 100
+PASS_RATIO = 0.6  # share of a round's ducks to shoot to advance
+SWARM_SIZE = 300
+SEED_BITS = 63
+
+DuckSnapshot = namedtuple('DuckSnapshot', 'id x y prev_x prev_y hit')
+SimSnapshot = namedtuple(
+    'SimSnapshot',
+    'tick ducks score round shots ducks_shot ducks_per_round game_active game_over'
+)
+
+
+class Duck:
+    """One duck's state and physics"""
+    __slots__ = ('id', 'x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'size',
+                 'alive', 'hit', 'fall_speed')
+
+    def __init__(self, duck_id, x, y, vx, vy, size=DUCK_SIZE):
+        self.id = duck_id
+        self.x = x
+        self.y = y
+        # Position before the latest step, for interpolated rendering
+        self.prev_x = x
+        self.prev_y = y
+        self.vx = vx
+        self.vy = vy
+        self.size = size
+        self.alive = True
+        self.hit = False
+        self.fall_speed = 0
+
+    @classmethod
+    def spawn(cls, duck_id, rng, width, height, speed_range=SPEED_RANGE):
+        """A duck taking off from the grass at a random speed and angle"""
+        x = rng.randint(50, width - 50)
+        y = height - 100
+        speed = rng.uniform(*speed_range)
+        angle = rng.uniform(30, 150)
+        vx = speed * math.cos(math.radians(angle))
+        vy = -speed * math.sin(math.radians(angle))
+        return cls(duck_id, x, y, vx, vy)
+
+    def move(self, width, height):
+        """Advance one simulation step"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        if self.hit:
+            # Duck is falling
+            self.fall_speed += 0.5
+            self.y += self.fall_speed
+            if self.y > height:
+                self.alive = False
+        else:
+            # Normal flight
+            self.x += self.vx
+            self.y += self.vy
+
+            # Bounce off walls
+            if self.x <= self.size or self.x >= width - self.size:
+                self.vx = -self.vx
+            if self.y <= self.size:
+                self.vy = -self.vy
+
+            # Escape if duck reaches top
+            if self.y < -50:
+                self.alive = False
+
+    def distance2(self, click_x, click_y):
+        """Squared distance from a point, to compare without the sqrt"""
+        dx = click_x - self.x
+        dy = click_y - self.y
+        return dx * dx + dy * dy
+
+    def snapshot(self):
+        return DuckSnapshot(self.id, self.x, self.y, self.prev_x, self.prev_y, self.hit)
+
+
+class DuckHuntSim:
+    """One game of Duck Hunt, advanced a fixed step at a time
+
+    Every random choice comes from a per-game generator seeded by
+    reset(), so a seed plus the tick-stamped shots replays a game
+    exactly.
+    """
+    def __init__(self, width=WIDTH, height=HEIGHT, rng=None):
+        self.width = width
+        self.height = height
+        self.rng = rng or random.Random()  # source of fresh game seeds
+        self.speed_range = SPEED_RANGE
+        self.reset()
+
+    def reset(self, seed=None):
+        """Back to round one, with no game running, from a seed (a fresh one by default)"""
+        self.seed = self.rng.getrandbits(SEED_BITS) if seed is None else seed
+        self.game_rng = random.Random(self.seed)
+        self.next_duck_id = 0
+        self.tick = 0
+        self.score = 0
+        self.round = 1
+        self.ducks_per_round = DUCKS_PER_ROUND
+        self.ducks_shot = 0
+        self.ducks_missed = 0
+        self.shots = SHOTS_PER_DUCK
+        self.ducks = []
+        self.game_active = False
+        self.game_over = False
+        self.over_at = None  # tick the game ended on
+        self.spawn_tick = None  # tick the next wave's first duck is due
+
+    def start(self):
+        self.game_active = True
+        self.game_over = False
+        self.spawn_duck()
+
+    def spawn_duck(self):
+        if len(self.ducks) < MAX_DUCKS_IN_FLIGHT and (self.ducks_shot + self.ducks_missed) < self.ducks_per_round:
+            duck = Duck.spawn(self.next_duck_id, self.game_rng, self.width, self.height, self.speed_range)
+            self.ducks.append(duck)
+            self.next_duck_id += 1
+            self.shots = SHOTS_PER_DUCK
+
+    def shoot(self, x, y):
+        """Fire at a point; returns True if a duck was hit"""
+        return any(self.shoot_batch([(x, y)]))
+
+    def shoot_batch(self, points):
+        """Fire a shot at each (x, y) in turn, as for a shotgun spread or
+        replayed input; returns a hit flag per shot actually fired"""
+        if not self.game_active or self.shots <= 0:
+            return []
+
+        points = points[:self.shots]
+        self.shots -= len(points)
+
+        hits = self.hit_ducks(points)
+        hit_count = sum(hits)
+        self.score += HIT_SCORE * hit_count
+        self.ducks_shot += hit_count
+
+        # Check if out of shots
+        if self.shots <= 0:
+            self.end_wave()
+        return hits
+
+    def hit_duck(self, x, y):
+        """Mark the nearest flying duck under a point as hit, as swarm mode does"""
+        nearest = None
+        nearest_distance2 = math.inf
+        for duck in self.ducks:
+            if not duck.hit:
+                distance2 = duck.distance2(x, y)
+                if distance2 <= duck.size * duck.size and distance2 < nearest_distance2:
+                    nearest, nearest_distance2 = duck, distance2
+        if nearest is None:
+            return False
+        nearest.hit = True
+        return True
+
+    def hit_ducks(self, points):
+        """Resolve shots in order; a duck hit by one can't be hit by the next"""
+        return [self.hit_duck(x, y) for x, y in points]
+
+    def end_wave(self):
+        # Clear all ducks
+        self.ducks.clear()
+
+        # Check progress
+        if self.ducks_shot >= self.ducks_per_round * PASS_RATIO:
+            self.round += 1
+            self.ducks_shot = 0
+            self.ducks_missed = 0
+            self.game_active = True
+            self.spawn_tick = self.tick + WAVE_DELAY_TICKS
+        else:
+            self.game_active = False
+            self.game_over = True
+            self.over_at = self.tick
+
+    def step(self):
+        """Advance the game by one fixed simulation step"""
+        self.tick += 1
+        if self.spawn_tick is not None and self.tick >= self.spawn_tick:
+            self.spawn_tick = None
+            self.spawn_duck()
+        if not self.game_active:
+            return
+
+        # Move all ducks
+        for duck in self.ducks[:]:
+            duck.move(self.width, self.height)
+            if not duck.alive:
+                if not duck.hit:
+                    self.ducks_missed += 1
+                self.ducks.remove(duck)
+
+                # Spawn next duck if available
+                if (self.ducks_shot + self.ducks_missed) < self.ducks_per_round:
+                    self.spawn_duck()
+                elif len(self.ducks) == 0:
+                    self.end_wave()
+
+    def snapshot(self):
+        """Everything a view needs to draw the current step"""
+        return SimSnapshot(
+            self.tick, self.duck_snapshots(), self.score, self.round,
+            self.shots, self.ducks_shot, self.ducks_per_round, self.game_active, self.game_over
+        )
+
+    def duck_snapshots(self):
+        return tuple(duck.snapshot() for duck in self.ducks)
+
+
+class SpatialGrid:
+    """Uniform grid bucketing points by cell, for radius queries
+
+    Building is a counting sort of the points' cell indices. A query
+    only looks at the 3x3 block of cells around a point, so the cell
+    size must be at least the query radius. Points outside the bounds
+    are clamped into the edge cells, which keeps queries exact.
+    """
+    def __init__(self, width, height, cell_size):
+        _require_numpy()
+        self.cell_size = cell_size
+        self.cols = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.order = np.zeros(0, dtype=np.int64)
+        self.starts = np.zeros(self.cols * self.rows + 1, dtype=np.int64)
+        # numpy's stable sort is a radix sort for 16-bit keys
+        self.cell_dtype = np.int16 if self.cols * self.rows <= np.iinfo(np.int16).max else np.int64
+
+    def cells(self, x, y):
+        cx = np.clip(np.floor_divide(x, self.cell_size).astype(np.int64), 0, self.cols - 1)
+        cy = np.clip(np.floor_divide(y, self.cell_size).astype(np.int64), 0, self.rows - 1)
+        return cx, cy
+
+    def build(self, x, y):
+        """Bucket points; queries return indices into x and y"""
+        cx, cy = self.cells(x, y)
+        cell = (cy * self.cols + cx).astype(self.cell_dtype)
+        self.order = np.argsort(cell, kind='stable')
+        np.cumsum(np.bincount(cell, minlength=self.cols * self.rows), out=self.starts[1:])
+
+    def query(self, x, y):
+        """Points in the cells around each query point
+
+        Returns (query, point) index arrays, one entry per candidate pair.
+        """
+        cx, cy = self.cells(np.atleast_1d(x), np.atleast_1d(y))
+        # The three cells of a row around a point are one contiguous run
+        rows = cy[:, None] + np.arange(-1, 2)
+        valid = (rows >= 0) & (rows < self.rows)
+        rows = np.clip(rows, 0, self.rows - 1) * self.cols
+        begin = self.starts[rows + np.maximum(cx - 1, 0)[:, None]]
+        lengths = np.where(valid, self.starts[rows + np.minimum(cx + 2, self.cols)[:, None]] - begin, 0)
+
+        lengths = lengths.ravel()
+        # Expand each [begin, begin + length) run into the indices it holds
+        run_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        within = np.arange(len(run_starts)) - run_starts
+        points = self.order[np.repeat(begin.ravel(), lengths) + within]
+        queries = np.repeat(np.arange(len(cx)).repeat(3), lengths)
+        return queries, points
+
+    def query_point(self, x, y):
+        """Points in the cells around a single point"""
+        cx = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        cy = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        starts = self.starts
+        first, last = max(cx - 1, 0), min(cx + 2, self.cols)
+        runs = [self.order[starts[row * self.cols + first]:starts[row * self.cols + last]]
+                for row in range(max(cy - 1, 0), min(cy + 2, self.rows))]
+        return np.concatenate(runs)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Swarm mode requires numpy (pip install numpy).")
+
+
+class DuckSwarm:
+    """Many ducks as structure-of-arrays, moved a whole step at a time
+
+    Live ducks occupy the first `count` slots of every array. Removing a
+    duck moves one from the end into its slot (swap-remove), so arrays
+    never shift and removal costs O(removed). Hit tests go through a
+    SpatialGrid with duck-sized cells, rebuilt on the first shot after
+    the ducks move.
+    """
+    FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'fall_speed')
+
+    def __init__(self, capacity=SWARM_SIZE, size=DUCK_SIZE, width=WIDTH, height=HEIGHT):
+        _require_numpy()
+        self.size = size
+        self.count = 0
+        self.grid = SpatialGrid(width, height, size)
+        self.grid_stale = True
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.hit = np.zeros(capacity, dtype=bool)
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity))
+
+    def __len__(self):
+        return self.count
+
+    def _arrays(self):
+        return [self.ids, self.hit] + [getattr(self, name) for name in self.FIELDS]
+
+    def add(self, duck):
+        """Append a Duck's state"""
+        if self.count == len(self.ids):
+            self._grow(max(2 * self.count, 1))
+        i = self.count
+        self.ids[i] = duck.id
+        self.hit[i] = duck.hit
+        for name in self.FIELDS:
+            getattr(self, name)[i] = getattr(duck, name)
+        self.count += 1
+        self.grid_stale = True
+
+    def _grow(self, capacity):
+        for name, array in zip(['ids', 'hit'] + list(self.FIELDS), self._arrays()):
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+
+    def clear(self):
+        self.count = 0
+        self.grid_stale = True
+
+    def remove(self, gone):
+        """Swap-remove the ducks flagged in a boolean array over the live slots"""
+        removed = int(gone.sum())
+        if not removed:
+            return
+        keep = self.count - removed
+        # Holes left below the new end are filled by survivors from above it
+        holes = np.flatnonzero(gone[:keep])
+        donors = keep + np.flatnonzero(~gone[keep:])
+        for array in self._arrays():
+            array[holes] = array[donors]
+        self.count = keep
+        self.grid_stale = True
+
+    def move(self, width, height):
+        """Advance every duck one step; returns (escaped, fallen) counts removed"""
+        n = self.count
+        if not n:
+            return 0, 0
+        x, y = self.x[:n], self.y[:n]
+        vx, vy = self.vx[:n], self.vy[:n]
+        fall_speed, hit = self.fall_speed[:n], self.hit[:n]
+        flying = ~hit
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        self.grid_stale = True
+
+        # Falling ducks accelerate straight down; the rest fly on
+        fall_speed[hit] += 0.5
+        x[flying] += vx[flying]
+        y += np.where(hit, fall_speed, vy)
+
+        # Bounce off walls
+        vx[flying & ((x <= self.size) | (x >= width - self.size))] *= -1
+        vy[flying & (y <= self.size)] *= -1
+
+        fallen = hit & (y > height)
+        escaped = flying & (y < -50)
+        gone = fallen | escaped
+        counts = int(escaped.sum()), int(fallen.sum())
+        self.remove(gone)
+        return counts
+
+    def hit_test(self, click_x, click_y):
+        """Mark the nearest flying duck under a point as hit"""
+        if not self.count:
+            return False
+        self._build_grid()
+        slots = self.grid.query_point(click_x, click_y)
+        dx = self.x[slots] - click_x
+        dy = self.y[slots] - click_y
+        distance2 = np.where(self.hit[slots], np.inf, dx * dx + dy * dy)
+        if not len(slots) or distance2.min() > self.size * self.size:
+            return False
+        self.hit[slots[distance2.argmin()]] = True
+        return True
+
+    def _build_grid(self):
+        if self.grid_stale:
+            self.grid.build(self.x[:self.count], self.y[:self.count])
+            self.grid_stale = False
+
+    def hit_test_many(self, click_x, click_y):
+        """Resolve a batch of shots in order, each hitting the nearest
+        flying duck under it that no earlier shot hit; returns a hit flag
+        per shot"""
+        click_x = np.asarray(click_x, dtype=float)
+        click_y = np.asarray(click_y, dtype=float)
+        hits = np.zeros(len(click_x), dtype=bool)
+        n = self.count
+        if not n or not len(click_x):
+            return hits
+        self._build_grid()
+
+        shots, slots = self.grid.query(click_x, click_y)
+        dx = self.x[slots] - click_x[shots]
+        dy = self.y[slots] - click_y[shots]
+        distance2 = dx * dx + dy * dy
+        under = ~self.hit[slots] & (distance2 <= self.size * self.size)
+        shots, slots, distance2 = shots[under], slots[under], distance2[under]
+
+        # Earlier shots first, nearest duck first within a shot
+        order = np.lexsort((distance2, shots))
+        for shot, slot in zip(shots[order].tolist(), slots[order].tolist()):
+            if not hits[shot] and not self.hit[slot]:
+                self.hit[slot] = True
+                hits[shot] = True
+        return hits
+
+    def snapshot(self):
+        n = self.count
+        return tuple(map(DuckSnapshot._make, zip(
+            self.ids[:n].tolist(), self.x[:n].tolist(), self.y[:n].tolist(),
+            self.prev_x[:n].tolist(), self.prev_y[:n].tolist(), self.hit[:n].tolist()
+        )))
+
+
+class DuckSwarmSim(DuckHuntSim):
+    """Swarm mode: a round's whole flock takes off at once
+
+    There is one shot per duck in the flock and no reloading between
+    ducks; the round ends when the shots run out or every duck is gone.
+    """
+    def __init__(self, width=WIDTH, height=HEIGHT, rng=None, swarm_size=SWARM_SIZE):
+        _require_numpy()
+        self.swarm_size = swarm_size
+        super().__init__(width, height, rng)
+
+    def reset(self, seed=None):
+        super().reset(seed)
+        self.ducks_per_round = self.swarm_size
+        self.ducks = DuckSwarm(self.swarm_size, width=self.width, height=self.height)
+
+    def spawn_duck(self):
+        """Launch the round's flock"""
+        while len(self.ducks) < self.ducks_per_round:
+            duck = Duck.spawn(self.next_duck_id, self.game_rng, self.width, self.height, self.speed_range)
+            self.ducks.add(duck)
+            self.next_duck_id += 1
+        self.shots = self.ducks_per_round
+
+    def hit_duck(self, x, y):
+        return self.ducks.hit_test(x, y)
+
+    def hit_ducks(self, points):
+        if not points:
+            return []
+        click_x, click_y = zip(*points)
+        return self.ducks.hit_test_many(click_x, click_y).tolist()
+
+    def step(self):
+        self.tick += 1
+        if self.spawn_tick is not None and self.tick >= self.spawn_tick:
+            self.spawn_tick = None
+            self.spawn_duck()
+        if not self.game_active:
+            return
+
+        escaped, fallen = self.ducks.move(self.width, self.height)
+        self.ducks_missed += escaped
+        if (escaped or fallen) and not len(self.ducks):
+            self.end_wave()
+
+    def duck_snapshots(self):
+        return self.ducks.snapshot()
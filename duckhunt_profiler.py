@@ -0,0 +1,90 @@
+"""Opt-in frame profiler for Duck Hunt.
+
+Wraps chosen methods so every call is timed into a ring buffer of
+spans, and keeps a second ring buffer of per-frame figures (frame
+interval, time spent working, Tk calls). The game draws a summary as
+an on-canvas overlay and can export the spans as Chrome trace-event
+JSON, to open in chrome://tracing or https://ui.perfetto.dev:
+
+    python duckhunt.py --profile
+
+F3 toggles the overlay, F4 writes a trace.
+"""
+import functools
+import json
+import math
+import os
+import time
+from collections import deque
+
+DEFAULT_TRACE_DIR = os.path.join(os.path.expanduser("~"), ".duckhunt", "traces")
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a sorted sequence"""
+    if not values:
+        return None
+    return values[max(math.ceil(p / 100 * len(values)), 1) - 1]
+
+
+class Profiler:
+    def __init__(self, max_spans=8192, max_frames=600, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.origin = clock()
+        self.spans = deque(maxlen=max_spans)    # (name, start ns, duration ns)
+        self.frames = deque(maxlen=max_frames)  # (interval ns, work ns, Tk calls)
+
+    def timed(self, func, name):
+        """func, recording a span for every call"""
+        clock = self.clock
+        spans = self.spans
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                spans.append((name, start, clock() - start))
+        return wrapper
+
+    def instrument(self, obj, *names):
+        """Replace methods on an instance with timed versions
+
+        Only calls made through the attribute are seen, so instrument
+        before handing the methods out as callbacks.
+        """
+        for name in names:
+            setattr(obj, name, self.timed(getattr(obj, name), f"{type(obj).__name__}.{name}"))
+
+    def frame(self, interval, work, tk_calls):
+        """Record one frame; interval and work are in seconds"""
+        self.frames.append((round(interval * 1e9), round(work * 1e9), tk_calls))
+
+    def summary(self):
+        """Percentiles over the frames in the buffer, times in milliseconds"""
+        intervals, work, calls = (sorted(column) for column in zip(*self.frames)) if self.frames else ([], [], [])
+        summary = {'frames': len(intervals)}
+        for label, values, scale in (('frame', intervals, 1e-6), ('work', work, 1e-6), ('tk_calls', calls, 1)):
+            for p in (50, 99):
+                value = percentile(values, p)
+                summary[f'{label}_p{p}'] = None if value is None else value * scale
+        return summary
+
+    def chrome_trace(self):
+        """The buffered spans as a Chrome trace-event document"""
+        pid = os.getpid()
+        events = [
+            {'name': name, 'ph': 'X', 'ts': (start - self.origin) / 1000, 'dur': duration / 1000,
+             'pid': pid, 'tid': 0}
+            for name, start, duration in self.spans
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, directory=DEFAULT_TRACE_DIR):
+        """Write the trace to a new file; returns its path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
@@ -0,0 +1,174 @@
+"""Deterministic Duck Hunt recordings and headless replay.
+
+A recording is a game's seed, mode and duck speed range plus every
+shot and pointer position, stamped with the simulation tick it happened
+on, and the final tick, score and round. Replaying re-runs the simulation from the
+seed as fast as it will go, firing each shot on its tick, and checks
+the outcome, so a corpus of recorded games can be re-verified in bulk
+whenever physics or scoring change:
+
+    python duckhunt_replay.py ~/.duckhunt/recordings
+
+Recordings are binary: a header, one 9-byte record per input and a
+footer, all little-endian. Coordinates are whole pixels, as Tk reports
+them.
+"""
+import argparse
+import os
+import struct
+import sys
+from collections import namedtuple
+
+from duckhunt_core import DuckHuntSim, DuckSwarmSim
+
+DEFAULT_RECORDINGS_DIR = os.path.join(os.path.expanduser("~"), ".duckhunt", "recordings")
+EXTENSION = '.dhr'
+
+MAGIC = b'DHR2'
+HEADER = struct.Struct('<4sQHHHdd')  # magic, seed, width, height, swarm size, speed range
+EVENT = struct.Struct('<BIhh')     # kind, tick, x, y
+FOOTER = struct.Struct('<IIH')     # end tick, score, round
+
+SHOT = 0
+MOTION = 1
+
+Recording = namedtuple('Recording', 'seed width height swarm_size speed_range events tick score round')
+# swarm_size: 0 for a classic game
+# speed_range: (low, high) duck take-off speed
+# events: tuple of (kind, tick, x, y)
+# tick: the tick the game ended on, or was abandoned at
+
+
+def start_recording(sim, seed=None):
+    """Start a fresh game on sim and return a Recorder for it
+
+    The game always starts from reset(), as replay() does: a sim that
+    has been stepping on the title screen has already moved its tick
+    on, and recording from there would not replay.
+    """
+    sim.reset(seed)
+    recorder = Recorder(sim)
+    sim.start()
+    return recorder
+
+
+class Recorder:
+    """Collects one game's inputs as it is played; see start_recording"""
+    def __init__(self, sim):
+        self.sim = sim
+        self.events = []
+
+    def shot(self, x, y):
+        """Call before passing the shot to the simulation"""
+        self.events.append((SHOT, self.sim.tick, x, y))
+
+    def motion(self, x, y):
+        # Only the last position within a tick is kept
+        if self.events and self.events[-1][:2] == (MOTION, self.sim.tick):
+            self.events.pop()
+        self.events.append((MOTION, self.sim.tick, x, y))
+
+    def recording(self):
+        sim = self.sim
+        return Recording(
+            sim.seed, sim.width, sim.height, getattr(sim, 'swarm_size', 0), tuple(sim.speed_range),
+            tuple(self.events),
+            sim.over_at if sim.game_over else sim.tick, sim.score, sim.round
+        )
+
+
+def encode_recording(recording):
+    parts = [HEADER.pack(MAGIC, recording.seed, recording.width, recording.height, recording.swarm_size,
+                         *recording.speed_range)]
+    parts.extend(EVENT.pack(*event) for event in recording.events)
+    parts.append(FOOTER.pack(recording.tick, recording.score, recording.round))
+    return b''.join(parts)
+
+
+def decode_recording(data):
+    if len(data) < HEADER.size + FOOTER.size or (len(data) - HEADER.size - FOOTER.size) % EVENT.size:
+        raise ValueError("Truncated recording.")
+    magic, seed, width, height, swarm_size, *speed_range = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"Not a Duck Hunt recording: {magic!r}")
+    events = tuple(EVENT.iter_unpack(data[HEADER.size:len(data) - FOOTER.size]))
+    return Recording(seed, width, height, swarm_size, tuple(speed_range), events,
+                     *FOOTER.unpack_from(data, len(data) - FOOTER.size))
+
+
+def write_recording(recording, directory=DEFAULT_RECORDINGS_DIR, name=None):
+    """Save a recording; returns its path"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, (name or f"{recording.seed:016x}") + EXTENSION)
+    with open(path, 'wb') as f:
+        f.write(encode_recording(recording))
+    return path
+
+
+def recording_paths(path):
+    """A recording file, or the recordings in a directory"""
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(EXTENSION))
+    return [path]
+
+
+def read_recording(path):
+    with open(path, 'rb') as f:
+        return decode_recording(f.read())
+
+
+def replay(recording):
+    """Re-run a recorded game headlessly; returns the finished simulation"""
+    if recording.swarm_size:
+        sim = DuckSwarmSim(recording.width, recording.height, swarm_size=recording.swarm_size)
+    else:
+        sim = DuckHuntSim(recording.width, recording.height)
+    sim.speed_range = recording.speed_range
+    sim.reset(recording.seed)
+    sim.start()
+
+    for kind, tick, x, y in recording.events:
+        while sim.tick < tick:
+            sim.step()
+        if kind == SHOT:
+            sim.shoot(x, y)
+    while not sim.game_over and sim.tick < recording.tick:
+        sim.step()
+    return sim
+
+
+def verify_recording(recording):
+    """Replay a recording; returns a description of any divergence, or None"""
+    sim = replay(recording)
+    tick = sim.over_at if sim.game_over else sim.tick
+    got = (tick, sim.score, sim.round)
+    expected = (recording.tick, recording.score, recording.round)
+    if got != expected:
+        return "replayed to tick {}, score {}, round {}; recorded tick {}, score {}, round {}".format(*got, *expected)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify recorded Duck Hunt games against the current simulation")
+    parser.add_argument('paths', nargs='+', help="recording files or directories of them")
+    parser.add_argument('--max-reports', type=int, default=20, help="divergences to print")
+    args = parser.parse_args(argv)
+
+    checked = diverged = 0
+    for recording_path in (path for arg in args.paths for path in recording_paths(arg)):
+        checked += 1
+        try:
+            problem = verify_recording(read_recording(recording_path))
+        except (OSError, ValueError) as e:
+            problem = f"Could not read recording: {e}"
+        if problem:
+            diverged += 1
+            if diverged <= args.max_reports:
+                print(f"{recording_path}\n    {problem}")
+
+    print(f"{checked} games replayed, {diverged} diverged")
+    return 1 if diverged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
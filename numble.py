@@ -1,44 +1,55 @@
+import os
 import tkinter as tk
 from tkinter import messagebox
-import random
-import json
-import os
+from numble_engine import DeadlineTimer, NumbleEngine, daily_seed, format_feedback, position_feedback
+from numble_solver import NumbleSolver
+from numble_stats import DEFAULT_DATA_DIR, StatsStore, game_record
+
+# NUMBLE_DEBUG=1 prints each game's seed and target, which gives the answer away
+DEBUG = bool(os.environ.get("NUMBLE_DEBUG"))
+
+
+def _engine_attr(name):
+    """Expose an engine attribute on the game as if it were its own"""
+    return property(
+        lambda self: getattr(self.engine, name),
+        lambda self, value: setattr(self.engine, name, value)
+    )
 
 
 class NumbleGame:
-    def __init__(self, root):
+    # Game state lives in the headless engine
+    digit_count = _engine_attr('digit_count')
+    par_score = _engine_attr('par_score')
+    target_number = _engine_attr('target_number')
+    guess_history = _engine_attr('guess_history')
+    game_over = _engine_attr('game_over')
+    game_won = _engine_attr('game_won')
+    allow_repeating_digits = _engine_attr('allow_repeating_digits')
+    difficulty_mode = _engine_attr('difficulty_mode')  # easy, standard, hard
+
+    def __init__(self, root, data_dir=DEFAULT_DATA_DIR):
         self.root = root
         self.root.title("Numble")
         self.root.geometry("550x750")
         self.root.configure(bg="#c6f6d5")  # Light green background
         
         # Game state
-        self.digit_count = 4
-        self.par_score = 7
-        self.target_number = ""
-        self.guess_history = []
-        self.game_over = False
-        self.game_won = False
+        self.engine = NumbleEngine()
+        self.solver = None  # kept in step with every guess, for instant hints
+        self.solver_error = None  # why there is no solver, if there isn't one
+        self.history_lines = {}  # display mode -> rendered history lines
+        self.stats_store = StatsStore(data_dir)
         self.show_symbol_positions = False
-        self.allow_repeating_digits = False
         
         # Game modes
-        self.difficulty_mode = "standard"  # easy, standard, hard
         self.speed_mode = False
-        self.timer_seconds = 30
+        self.daily_mode = False
+        self.speed_timer = DeadlineTimer()
+        self.timer_text = "Time: 30s"
         self.timer_running = False
         self.timer_id = None
         
-        # Stats
-        self.stats = {
-            'games_played': 0,
-            'games_won': 0,
-            'current_streak': 0,
-            'best_streak': 0,
-            'total_guesses': 0,
-            'best_score': float('inf')
-        }
-        
         self.setup_ui()
         self.load_stats()
         self.reset_game()
@@ -110,6 +121,20 @@ class NumbleGame:
             activebackground="#9ae6b4"
         ).grid(row=1, column=2, columnspan=2, padx=10, pady=5, sticky="w")
         
+        # Daily puzzle checkbox
+        self.daily_var = tk.BooleanVar()
+        tk.Checkbutton(
+            mode_frame,
+            text="Daily Puzzle",
+            variable=self.daily_var,
+            command=self.toggle_daily_mode,
+            font=("Arial", 9),
+            bg="#9ae6b4",
+            fg="#22543d",
+            selectcolor="#c6f6d5",
+            activebackground="#9ae6b4"
+        ).grid(row=2, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+        
         # Timer display (only visible in speed mode)
         self.timer_frame = tk.Frame(self.root, bg="#c6f6d5")
         self.timer_label = tk.Label(
@@ -218,6 +243,18 @@ class NumbleGame:
         )
         self.guess_button.pack(side=tk.LEFT, padx=5)
         
+        self.hint_button = tk.Button(
+            input_frame,
+            text="Hint",
+            command=self.show_hint,
+            font=("Arial", 12, "bold"),
+            bg="#2f855a",
+            fg="white",
+            width=6,
+            cursor="hand2"
+        )
+        self.hint_button.pack(side=tk.LEFT, padx=5)
+        
         # Error label
         self.error_label = tk.Label(
             self.root,
@@ -273,22 +310,18 @@ class NumbleGame:
         ).pack(pady=5)
     
     def generate_target_number(self):
-        if self.allow_repeating_digits:
-            # Allow any digits including repeats
-            return ''.join(str(random.randint(0, 9)) for _ in range(self.digit_count))
-        else:
-            # No repeating digits
-            digits = list(range(10))
-            random.shuffle(digits)
-            return ''.join(map(str, digits[:self.digit_count]))
+        return self.engine.generate_target_number()
+    
+    @property
+    def stats(self):
+        return self.stats_store.stats
     
     def reset_game(self):
         self.stop_timer()
-        self.target_number = self.generate_target_number()
-        self.guess_history = []
-        self.game_over = False
-        self.game_won = False
-        self.timer_seconds = 30
+        if self.guess_history and not self.game_over:
+            self.record_game('abandoned')
+        # Daily puzzles share a seed, so everyone gets the same target
+        self.engine.new_game(seed=daily_seed() if self.daily_mode else None)
         self.entry.delete(0, tk.END)
         self.error_label.config(text="")
         
@@ -297,6 +330,7 @@ class NumbleGame:
             widget.destroy()
         
         # Clear history
+        self.history_lines = {}
         self.history_text.config(state=tk.NORMAL)
         self.history_text.delete(1.0, tk.END)
         self.history_text.insert(tk.END, "No guesses yet...\n")
@@ -304,11 +338,15 @@ class NumbleGame:
         
         self.entry.config(state=tk.NORMAL)
         self.guess_button.config(state=tk.NORMAL)
+        self.hint_button.config(state=tk.NORMAL)
         
         if self.speed_mode:
             self.start_timer()
         
-        print(f"Debug - Target number: {self.target_number}")
+        self.prepare_solver()
+        
+        if DEBUG:
+            print(f"Debug - Game seed: {self.engine.seed}, target number: {self.target_number}")
     
     def change_difficulty_mode(self):
         self.difficulty_mode = self.difficulty_var.get()
@@ -322,6 +360,7 @@ class NumbleGame:
             self.show_symbol_positions = False
         else:
             self.position_checkbox.config(state=tk.NORMAL)
+        self.prepare_solver()
     
     def toggle_speed_mode(self):
         self.speed_mode = self.speed_var.get()
@@ -338,10 +377,16 @@ class NumbleGame:
         self.update_instructions()
         self.reset_game()
     
+    def toggle_daily_mode(self):
+        self.daily_mode = self.daily_var.get()
+        self.reset_game()
+    
     def start_timer(self):
         if not self.timer_running and not self.game_over:
             self.timer_running = True
-            self.update_timer()
+            self.speed_timer.reset()
+            self.update_timer_label()
+            self.timer_id = self.root.after(self.speed_timer.next_wakeup_ms(), self.update_timer)
     
     def stop_timer(self):
         self.timer_running = False
@@ -350,23 +395,37 @@ class NumbleGame:
             self.timer_id = None
     
     def update_timer(self):
+        self.timer_id = None
         if not self.timer_running or self.game_over:
             return
         
-        if self.timer_seconds > 0:
-            self.timer_label.config(text=f"Time: {self.timer_seconds}s")
-            self.timer_seconds -= 1
-            self.timer_id = self.root.after(1000, self.update_timer)
-        else:
+        self.speed_timer.woke()
+        if self.speed_timer.remaining() <= 0:
             # Time's up! Auto-submit current guess
             self.check_guess()
+            if self.game_over:
+                return
+            self.speed_timer.reset()
+        
+        self.update_timer_label()
+        self.timer_id = self.root.after(self.speed_timer.next_wakeup_ms(), self.update_timer)
+    
+    def update_timer_label(self):
+        text = f"Time: {self.speed_timer.seconds_left()}s"
+        if text != self.timer_text:
+            self.timer_text = text
+            self.timer_label.config(text=text)
     
     def on_entry_change(self, event):
-        # Reset timer when user types (only in speed mode)
+        # Reset timer when user types (only in speed mode); the pending
+        # wakeup stays scheduled and simply finds the deadline moved
         if self.speed_mode and not self.game_over:
-            self.stop_timer()
-            self.timer_seconds = 30
-            self.start_timer()
+            self.speed_timer.reset()
+            self.update_timer_label()
+    
+    def timer_drift(self):
+        """How late speed-mode timer wakeups have been, in seconds"""
+        return self.speed_timer.drift_stats()
     
     def check_guess(self):
         if self.game_over:
@@ -375,145 +434,105 @@ class NumbleGame:
         guess = self.entry.get().strip()
         
         # Validate guess
-        if len(guess) != self.digit_count:
-            self.error_label.config(text=f"Please enter exactly {self.digit_count} digits.")
-            if self.speed_mode:
-                self.timer_seconds = 30  # Reset timer on error
-            return
-        
-        if not guess.isdigit():
-            self.error_label.config(text="Please enter only numbers.")
-            if self.speed_mode:
-                self.timer_seconds = 30  # Reset timer on error
-            return
-        
-        if not self.allow_repeating_digits and len(set(guess)) != len(guess):
-            self.error_label.config(text="Your guess cannot contain repeated digits.")
+        error = self.engine.validate_guess(guess)
+        if error:
+            self.error_label.config(text=error)
             if self.speed_mode:
-                self.timer_seconds = 30  # Reset timer on error
+                self.speed_timer.reset()  # Reset timer on error
             return
         
         # Clear error
         self.error_label.config(text="")
         
-        # Calculate feedback based on mode
-        feedback_result = self.calculate_feedback(guess)
-        
-        # Add to history
-        self.guess_history.append(feedback_result)
+        # Score, record and check for a win
+        result = self.engine.submit_guess(guess)
+        if self.solver is not None and not self.game_over:
+            # Narrow the hint candidates now rather than on the next hint
+            self.solver.add_guess(guess, result['code'])
         
         # Update history display
-        self.update_history_display()
+        self.append_history_entry()
         
         # Clear entry and reset timer
         self.entry.delete(0, tk.END)
         if self.speed_mode:
-            self.timer_seconds = 30
+            self.speed_timer.reset()
         
-        # Check if won
-        if feedback_result['correct_positions'] == self.digit_count:
-            self.game_won = True
-            self.game_over = True
+        if self.game_won:
             self.stop_timer()
-            self.update_stats(len(self.guess_history))
+            self.record_game('won')
             self.show_win_screen()
     
+    def prepare_solver(self):
+        """Bring the solver up to the current settings and game, so that hints
+        only have to pick a guess; rebuilds it when the settings change"""
+        try:
+            if self.solver is None:
+                self.solver = NumbleSolver(self.digit_count, self.allow_repeating_digits,
+                                           self.difficulty_mode, self.show_symbol_positions)
+            self.solver.sync(self.engine, self.show_symbol_positions)
+        except ImportError as e:
+            self.solver_error = str(e)
+    
+    def show_hint(self):
+        """Fill the entry with the solver's most informative guess"""
+        if self.game_over:
+            return
+        if self.solver is None:
+            self.error_label.config(text=self.solver_error)
+            return
+        
+        suggestion = self.solver.suggest()
+        if suggestion:
+            self.entry.delete(0, tk.END)
+            self.entry.insert(0, suggestion)
+    
     def calculate_feedback(self, guess):
         """Calculate feedback based on current game mode and settings"""
-        correct_positions = 0
-        position_feedback = [''] * self.digit_count
-        
-        if self.allow_repeating_digits:
-            # With repeating digits: match each target digit to exactly one guess digit
-            target_list = list(self.target_number)
-            guess_list = list(guess)
-            matched_target = [False] * self.digit_count
-            matched_guess = [False] * self.digit_count
-            
-            # First pass: exact matches
-            for i in range(self.digit_count):
-                if guess_list[i] == target_list[i]:
-                    correct_positions += 1
-                    position_feedback[i] = '🔒'
-                    matched_target[i] = True
-                    matched_guess[i] = True
-            
-            # Second pass: wrong position matches
-            correct_digits = 0
-            for i in range(self.digit_count):
-                if not matched_guess[i]:
-                    for j in range(self.digit_count):
-                        if not matched_target[j] and guess_list[i] == target_list[j]:
-                            correct_digits += 1
-                            position_feedback[i] = '🔓'
-                            matched_target[j] = True
-                            break
-        else:
-            # Without repeating digits: simpler logic
-            correct_digits = 0
-            for i in range(self.digit_count):
-                if guess[i] == self.target_number[i]:
-                    correct_positions += 1
-                    position_feedback[i] = '🔒'
-                elif guess[i] in self.target_number:
-                    correct_digits += 1
-                    position_feedback[i] = '🔓'
-        
-        # Create feedback string based on difficulty mode
-        if self.difficulty_mode == "hard":
-            feedback = str(correct_positions)
-        elif self.difficulty_mode == "easy":
-            feedback = ''.join(position_feedback)
-            # Fill empty positions with underscore
-            feedback = ' '.join(position_feedback[i] if position_feedback[i] else '_' for i in range(self.digit_count))
-        else:  # standard
-            feedback = "🔒" * correct_positions + "🔓" * correct_digits
-            if not feedback:
-                feedback = "No matches"
-        
-        return {
-            'guess': guess,
-            'feedback': feedback,
-            'position_feedback': position_feedback,
-            'correct_positions': correct_positions
-        }
+        return self.engine.calculate_feedback(guess)
+    
+    def history_display_mode(self):
+        if self.difficulty_mode == "standard" and self.show_symbol_positions:
+            return "positions"
+        return self.difficulty_mode
+    
+    def rendered_history_lines(self):
+        """Rendered lines for the current display mode, rendering only new entries"""
+        mode = self.history_display_mode()
+        lines = self.history_lines.setdefault(mode, [])
+        for i in range(len(lines), len(self.guess_history)):
+            item = self.guess_history[i]
+            symbols = position_feedback(item['code'], self.digit_count)
+            display = format_feedback(symbols, self.difficulty_mode, self.show_symbol_positions)
+            lines.append(f"{i + 1}. {item['guess']}  →  {display}\n")
+        return lines
     
     def update_history_display(self):
         """Re-render all history entries based on current display mode"""
+        lines = self.rendered_history_lines()
+        
         self.history_text.config(state=tk.NORMAL)
         self.history_text.delete(1.0, tk.END)
+        self.history_text.insert(tk.END, ''.join(lines) or "No guesses yet...\n")
+        self.history_text.config(state=tk.DISABLED)
+        self.history_text.see(tk.END)
+    
+    def append_history_entry(self):
+        """Add the latest guess to the history without re-rendering the rest"""
+        lines = self.rendered_history_lines()
         
-        for i, item in enumerate(self.guess_history, 1):
-            # Recalculate display based on current mode settings
-            if self.difficulty_mode == "easy":
-                # Easy mode always shows positions
-                display = ' '.join(item['position_feedback'][j] if item['position_feedback'][j] else '_' 
-                                  for j in range(self.digit_count))
-                self.history_text.insert(tk.END, f"{i}. {item['guess']}  →  {display}\n")
-            elif self.difficulty_mode == "hard":
-                # Hard mode only shows count - recalculate from position_feedback
-                correct_count = sum(1 for symbol in item['position_feedback'] if symbol == '🔒')
-                self.history_text.insert(tk.END, f"{i}. {item['guess']}  →  {correct_count}\n")
-            elif self.show_symbol_positions:
-                # Standard mode with position display
-                position_display = ' '.join(item['position_feedback'][j] if item['position_feedback'][j] else '·' 
-                                           for j in range(self.digit_count))
-                self.history_text.insert(tk.END, f"{i}. {item['guess']}  →  {position_display}\n")
-            else:
-                # Standard mode without position display - recalculate sorted symbols
-                locks = sum(1 for symbol in item['position_feedback'] if symbol == '🔒')
-                unlocks = sum(1 for symbol in item['position_feedback'] if symbol == '🔓')
-                sorted_feedback = "🔒" * locks + "🔓" * unlocks
-                if not sorted_feedback:
-                    sorted_feedback = "No matches"
-                self.history_text.insert(tk.END, f"{i}. {item['guess']}  →  {sorted_feedback}\n")
-        
+        self.history_text.config(state=tk.NORMAL)
+        if len(lines) == 1:
+            # Replace the "No guesses yet..." placeholder
+            self.history_text.delete(1.0, tk.END)
+        self.history_text.insert(tk.END, lines[-1])
         self.history_text.config(state=tk.DISABLED)
         self.history_text.see(tk.END)
     
     def show_win_screen(self):
         self.entry.config(state=tk.DISABLED)
         self.guess_button.config(state=tk.DISABLED)
+        self.hint_button.config(state=tk.DISABLED)
         
         # Clear result frame
         for widget in self.result_frame.winfo_children():
@@ -550,35 +569,7 @@ class NumbleGame:
         ).pack(pady=10)
     
     def get_score_message(self, guess_count):
-        diff = guess_count - self.par_score
-        
-        if diff <= -4:
-            term = "Albatross+"
-        elif diff == -3:
-            term = "Eagle"
-        elif diff == -2:
-            term = "Double Birdie"
-        elif diff == -1:
-            term = "Birdie"
-        elif diff == 0:
-            term = "Par"
-        elif diff == 1:
-            term = "Bogey"
-        elif diff == 2:
-            term = "Double Bogey"
-        else:
-            term = "Triple+ Bogey"
-        
-        return f"Solved in {guess_count} guesses ({term})"
-    
-    def update_stats(self, guess_count):
-        self.stats['games_played'] += 1
-        self.stats['games_won'] += 1
-        self.stats['current_streak'] += 1
-        self.stats['best_streak'] = max(self.stats['current_streak'], self.stats['best_streak'])
-        self.stats['total_guesses'] += guess_count
-        self.stats['best_score'] = min(self.stats['best_score'], guess_count)
-        self.save_stats()
+        return self.engine.get_score_message(guess_count)
     
     def show_stats(self):
         stats_window = tk.Toplevel(self.root)
@@ -677,22 +668,19 @@ class NumbleGame:
     def toggle_symbol_positions(self):
         self.show_symbol_positions = self.show_positions_var.get()
         self.update_history_display()
+        self.prepare_solver()
     
     def load_stats(self):
-        """Load stats from file if it exists"""
+        """Load stats from the snapshot and the games logged since"""
         try:
-            if os.path.exists('numble_stats.json'):
-                with open('numble_stats.json', 'r') as f:
-                    saved_stats = json.load(f)
-                    self.stats.update(saved_stats)
+            self.stats_store.load()
         except Exception as e:
             print(f"Could not load stats: {e}")
     
-    def save_stats(self):
-        """Save stats to file"""
+    def record_game(self, outcome):
+        """Append the current game to the stats log"""
         try:
-            with open('numble_stats.json', 'w') as f:
-                json.dump(self.stats, f)
+            self.stats_store.record_game(game_record(self.engine, outcome, speed_mode=self.speed_mode))
         except Exception as e:
             print(f"Could not save stats: {e}")
 
@@ -0,0 +1,469 @@
+"""Headless Numble game engine.
+
+Everything needed to play Numble without a display: target generation,
+guess validation, feedback scoring and win detection. `submit_guess`
+returns feedback formatted for display; `submit_code` skips that and
+returns only the packed code, for simulations. Stats are kept by
+`numble_stats.StatsStore` from the games it is given. `numble.NumbleGame`
+is a Tk front end that delegates to `NumbleEngine`.
+"""
+import hashlib
+import math
+import random
+import time
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+from itertools import permutations, product
+
+try:
+    import numpy as np
+except ImportError:  # batch scoring is optional
+    np = None
+
+MIN_DIGITS = 3
+MAX_DIGITS = 6
+DEFAULT_PAR = 7
+DIFFICULTY_MODES = ("easy", "standard", "hard")
+SPEED_MODE_SECONDS = 30
+SEED_BITS = 63
+
+LOCK = '🔒'
+UNLOCK = '🔓'
+
+# Feedback codes pack the lock mask in the low MASK_BITS bits and the
+# unlock mask in the next MASK_BITS bits, so every code fits in 12 bits.
+MASK_BITS = MAX_DIGITS
+POSITION_MASK = (1 << MASK_BITS) - 1
+
+
+@lru_cache(maxsize=None)
+def all_numbers(digit_count, allow_repeating_digits):
+    """Every valid number for the settings, in ascending order"""
+    if allow_repeating_digits:
+        return tuple(map(''.join, product('0123456789', repeat=digit_count)))
+    return tuple(map(''.join, permutations('0123456789', digit_count)))
+
+
+def settings_key(digit_count, allow_repeating_digits, difficulty_mode):
+    """Short label for a combination of game settings, e.g. '4/unique/standard'"""
+    repeat = "repeat" if allow_repeating_digits else "unique"
+    return f"{digit_count}/{repeat}/{difficulty_mode}"
+
+
+def parse_settings_key(key):
+    """Inverse of settings_key: (digit_count, allow_repeating_digits, difficulty_mode)"""
+    digit_count, repeat, difficulty_mode = key.split('/')
+    return int(digit_count), repeat == "repeat", difficulty_mode
+
+
+def shared_seed(text):
+    """Game seed derived from any shared string, the same on every machine"""
+    digest = hashlib.sha256(f"numble/{text}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big') >> (64 - SEED_BITS)
+
+
+def daily_seed(day=None):
+    """Seed shared by everyone playing on the given date (today by default)"""
+    day = day or date.today()
+    return shared_seed(day.isoformat())
+
+
+def _mix_seed(seed):
+    """SplitMix64 finalizer: spreads any seed evenly over 64 bits.
+
+    Spelled out rather than seeding `random`, so targets stay the same
+    across Python versions and seeding costs next to nothing.
+    """
+    z = (seed + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return z ^ (z >> 31)
+
+
+def score_guess(guess, target):
+    """Score a guess against a target and return its packed feedback code.
+
+    Exact matches lock first; each remaining guess digit (left to right)
+    then claims one unmatched occurrence of that digit in the target.
+    """
+    lock_mask = 0
+    unlock_mask = 0
+    spare = {}
+    pending = []
+    for i, (g, t) in enumerate(zip(guess, target)):
+        if g == t:
+            lock_mask |= 1 << i
+        else:
+            spare[t] = spare.get(t, 0) + 1
+            pending.append(i)
+    for i in pending:
+        g = guess[i]
+        if spare.get(g):
+            spare[g] -= 1
+            unlock_mask |= 1 << i
+    return lock_mask | (unlock_mask << MASK_BITS)
+
+
+def lock_count(code):
+    return bin(code & POSITION_MASK).count('1')
+
+
+def unlock_count(code):
+    return bin(code >> MASK_BITS).count('1')
+
+
+def position_feedback(code, digit_count):
+    """Expand a feedback code into one lock/unlock/'' symbol per position"""
+    return list(_position_symbols(code, digit_count))
+
+
+@lru_cache(maxsize=None)
+def _position_symbols(code, digit_count):
+    symbols = []
+    for i in range(digit_count):
+        if code >> i & 1:
+            symbols.append(LOCK)
+        elif code >> (i + MASK_BITS) & 1:
+            symbols.append(UNLOCK)
+        else:
+            symbols.append('')
+    return tuple(symbols)
+
+
+BatchFeedback = namedtuple('BatchFeedback', 'locks unlocks lock_mask unlock_mask')
+BatchFeedback.codes = property(
+    lambda self: self.lock_mask.astype(np.uint16) | (self.unlock_mask.astype(np.uint16) << MASK_BITS),
+    doc="Packed feedback codes, as returned by score_guess"
+)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Batch scoring requires numpy (pip install numpy).")
+
+
+def as_digits(numbers):
+    """Convert a number string, or a sequence of them, to a uint8 digit array"""
+    _require_numpy()
+    if isinstance(numbers, np.ndarray):
+        return numbers.astype(np.uint8, copy=False)
+    if isinstance(numbers, str):
+        return np.frombuffer(numbers.encode(), dtype=np.uint8) - 48
+    numbers = list(numbers)
+    digit_count = len(numbers[0]) if numbers else 0
+    return (np.frombuffer(''.join(numbers).encode(), dtype=np.uint8) - 48).reshape(-1, digit_count)
+
+
+@lru_cache(maxsize=None)
+def all_digits(digit_count, allow_repeating_digits):
+    """`all_numbers` as a read-only (N, digit_count) digit array"""
+    _require_numpy()
+    if allow_repeating_digits:
+        values = np.arange(10 ** digit_count)
+        powers = 10 ** np.arange(digit_count - 1, -1, -1)
+        digits = (values[:, None] // powers % 10).astype(np.uint8)
+    else:
+        digits = as_digits(all_numbers(digit_count, False))
+    digits.flags.writeable = False
+    return digits
+
+
+def score_batch(guesses, targets):
+    """Score guesses against many targets in one vectorized pass.
+
+    `guesses` is one number (string or 1-D digit array) or several (a
+    sequence of strings or a 2-D digit array); `targets` is a sequence of
+    strings or a 2-D digit array. Returns a BatchFeedback of arrays shaped
+    (N,) for a single guess or (M, N) for several, matching score_guess
+    exactly, including its left-to-right matching of repeated digits.
+    """
+    guess_digits = as_digits(guesses)
+    target_digits = as_digits(targets)
+    single = guess_digits.ndim == 1
+    if single:
+        guess_digits = guess_digits[None, :]
+    digit_count = guess_digits.shape[1]
+
+    # Work on contiguous (M, N) planes, one per digit position
+    g = [column[:, None] for column in guess_digits.T]
+    t = [np.ascontiguousarray(column)[None, :] for column in target_digits.T]
+    free = [g[i] != t[i] for i in range(digit_count)]  # did not lock
+
+    lock_mask = np.zeros(free[0].shape, dtype=np.uint8)
+    unlock_mask = np.zeros(free[0].shape, dtype=np.uint8)
+    for i in range(digit_count):
+        lock_mask |= (~free[i]).view(np.uint8) << i
+
+    # Scratch planes reused across positions to avoid temporaries
+    match = np.empty(free[0].shape, dtype=bool)
+    spare = np.empty(free[0].shape, dtype=np.uint8)
+    claimed = np.empty(free[0].shape, dtype=np.uint8)
+    for i in range(digit_count):
+        # Free occurrences of this digit in the target...
+        spare.fill(0)
+        for j in range(digit_count):
+            np.equal(t[j], g[i], out=match)
+            match &= free[j]
+            spare += match
+        # ...minus those already claimed by free guess digits to the left
+        claimed.fill(0)
+        for j in range(i):
+            np.logical_and(g[j] == g[i], free[j], out=match)
+            claimed += match
+        np.less(claimed, spare, out=match)
+        match &= free[i]
+        unlock_mask |= match.view(np.uint8) << i
+
+    result = BatchFeedback(
+        _popcount(lock_mask), _popcount(unlock_mask), lock_mask, unlock_mask
+    )
+    if single:
+        result = BatchFeedback(*(array[0] for array in result))
+    return result
+
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8) if np else None
+
+
+def _popcount(masks):
+    return _POPCOUNT[masks]
+
+
+def unpack_codes(codes):
+    """BatchFeedback for an array of packed feedback codes, as score_batch
+    would have returned for the same pairs"""
+    _require_numpy()
+    lock_mask = (codes & POSITION_MASK).astype(np.uint8)
+    unlock_mask = (codes >> MASK_BITS).astype(np.uint8)
+    return BatchFeedback(_popcount(lock_mask), _popcount(unlock_mask), lock_mask, unlock_mask)
+
+
+def feedback_code(position_feedback):
+    """Pack per-position symbols back into a feedback code"""
+    code = 0
+    for i, symbol in enumerate(position_feedback):
+        if symbol == LOCK:
+            code |= 1 << i
+        elif symbol == UNLOCK:
+            code |= 1 << (i + MASK_BITS)
+    return code
+
+
+def format_feedback(position_feedback, difficulty_mode, show_positions=False):
+    """Render per-position symbols the way the given mode displays them"""
+    if difficulty_mode == "easy":
+        # Easy mode always shows positions
+        return ' '.join(symbol if symbol else '_' for symbol in position_feedback)
+    locks = position_feedback.count(LOCK)
+    if difficulty_mode == "hard":
+        # Hard mode only shows the count of correct positions
+        return str(locks)
+    if show_positions:
+        return ' '.join(symbol if symbol else '·' for symbol in position_feedback)
+    unlocks = position_feedback.count(UNLOCK)
+    return LOCK * locks + UNLOCK * unlocks or "No matches"
+
+
+class NumbleEngine:
+    def __init__(self, digit_count=4, allow_repeating_digits=False,
+                 difficulty_mode="standard", par_score=DEFAULT_PAR, rng=None,
+                 use_feedback_table=False):
+        self.digit_count = digit_count
+        self.allow_repeating_digits = allow_repeating_digits
+        self.difficulty_mode = difficulty_mode
+        self.par_score = par_score
+        self.rng = rng or random.Random()  # source of per-game seeds
+        # Score through the precomputed tables in numble_table
+        self.use_feedback_table = use_feedback_table
+
+        self.seed = None
+        self.target_number = ""
+        self.game_settings = self.settings()
+        self.guess_history = []  # {'guess', 'code', 'elapsed'} per guess
+        self.game_over = False
+        self.game_won = False
+        self.started_at = time.time()
+        self._start_clock = time.monotonic()
+
+    def settings(self):
+        """(digit_count, allow_repeating_digits, difficulty_mode) as they are now"""
+        return self.digit_count, self.allow_repeating_digits, self.difficulty_mode
+
+    def generate_target_number(self, rng=None):
+        rng = rng or self.rng
+        if self.allow_repeating_digits:
+            # Allow any digits including repeats
+            return str(rng.randrange(10 ** self.digit_count)).zfill(self.digit_count)
+        # No repeating digits
+        return rng.choice(all_numbers(self.digit_count, False))
+
+    def target_for_seed(self, seed):
+        """The target a game with this seed and the current settings plays"""
+        index = _mix_seed(seed)
+        if self.allow_repeating_digits:
+            return str(index % 10 ** self.digit_count).zfill(self.digit_count)
+        numbers = all_numbers(self.digit_count, False)
+        return numbers[index % len(numbers)]
+
+    def new_game(self, target_number=None, seed=None):
+        """Start a new game from a seed (a fresh one by default), or against a fixed target"""
+        if target_number:
+            self.seed = None
+        else:
+            self.seed = self.rng.getrandbits(SEED_BITS) if seed is None else seed
+            target_number = self.target_for_seed(self.seed)
+        self.target_number = target_number
+        # What this game is played under, even if a front end changes the
+        # settings before it is recorded and the next one starts
+        self.game_settings = self.settings()
+        self.guess_history = []
+        self.game_over = False
+        self.game_won = False
+        self.started_at = time.time()
+        self._start_clock = time.monotonic()
+        return self.target_number
+
+    def elapsed(self):
+        """Seconds since the current game started"""
+        return time.monotonic() - self._start_clock
+
+    def validate_guess(self, guess):
+        """Return an error message for an invalid guess, or None"""
+        if len(guess) != self.digit_count:
+            return f"Please enter exactly {self.digit_count} digits."
+        if not guess.isdigit():
+            return "Please enter only numbers."
+        if not self.allow_repeating_digits and len(set(guess)) != len(guess):
+            return "Your guess cannot contain repeated digits."
+        return None
+
+    def score(self, guess):
+        """Packed feedback code of a guess against the target"""
+        if self.use_feedback_table:
+            from numble_table import get_table
+            return get_table(self.digit_count, self.allow_repeating_digits).score(guess, self.target_number)
+        return score_guess(guess, self.target_number)
+
+    def calculate_feedback(self, guess):
+        """Calculate feedback based on current game mode and settings"""
+        return self.describe_feedback(guess, self.score(guess))
+
+    def describe_feedback(self, guess, code):
+        """A feedback code expanded for display in the current mode"""
+        symbols = position_feedback(code, self.digit_count)
+        return {
+            'guess': guess,
+            'feedback': format_feedback(symbols, self.difficulty_mode),
+            'position_feedback': symbols,
+            'correct_positions': lock_count(code),
+            'code': code
+        }
+
+    def calculate_feedback_batch(self, guesses, targets=None):
+        """Score guesses against many targets at once (every valid number by default)"""
+        if targets is None:
+            targets = all_digits(self.digit_count, self.allow_repeating_digits)
+        return score_batch(guesses, targets)
+
+    def submit_code(self, guess):
+        """Score a validated guess, record it and detect a win; returns only
+        the feedback code, for players that don't display it"""
+        if self.game_over:
+            raise ValueError("The game is already over.")
+        error = self.validate_guess(guess)
+        if error:
+            raise ValueError(error)
+
+        code = self.score(guess)
+        self.guess_history.append({'guess': guess, 'code': code, 'elapsed': time.monotonic() - self._start_clock})
+        if code & POSITION_MASK == (1 << self.digit_count) - 1:
+            self.game_won = True
+            self.game_over = True
+        return code
+
+    def submit_guess(self, guess):
+        """submit_code, returning the feedback as calculate_feedback does"""
+        code = self.submit_code(guess)
+        feedback_result = self.describe_feedback(guess, code)
+        feedback_result['elapsed'] = self.guess_history[-1]['elapsed']
+        return feedback_result
+
+    def get_score_message(self, guess_count):
+        diff = guess_count - self.par_score
+
+        if diff <= -4:
+            term = "Albatross+"
+        elif diff == -3:
+            term = "Eagle"
+        elif diff == -2:
+            term = "Double Birdie"
+        elif diff == -1:
+            term = "Birdie"
+        elif diff == 0:
+            term = "Par"
+        elif diff == 1:
+            term = "Bogey"
+        elif diff == 2:
+            term = "Double Bogey"
+        else:
+            term = "Triple+ Bogey"
+
+        return f"Solved in {guess_count} guesses ({term})"
+
+
+class DeadlineTimer:
+    """Speed-mode countdown measured against a monotonic deadline.
+
+    Resetting only moves the deadline, so callers never need to cancel a
+    pending wakeup. Each wakeup is compared with the time it was asked
+    for, and the lateness is kept as the timer's drift.
+    """
+
+    def __init__(self, seconds=SPEED_MODE_SECONDS, clock=time.monotonic):
+        self.seconds = seconds
+        self.clock = clock
+        self.deadline = clock() + seconds
+        self.expected_wakeup = None
+        self.wakeups = 0
+        self.last_drift = 0.0
+        self.max_drift = 0.0
+        self.total_drift = 0.0
+
+    def reset(self):
+        self.deadline = self.clock() + self.seconds
+
+    def remaining(self):
+        return self.deadline - self.clock()
+
+    def seconds_left(self):
+        """Whole seconds left, rounded up as a countdown shows them"""
+        return max(0, math.ceil(self.remaining()))
+
+    def next_wakeup_ms(self):
+        """Milliseconds until the shown count next changes or time runs out"""
+        remaining = self.remaining()
+        step = remaining - (math.ceil(remaining) - 1) if remaining > 0 else 0
+        delay_ms = math.ceil(step * 1000)
+        self.expected_wakeup = self.clock() + delay_ms / 1000
+        return delay_ms
+
+    def woke(self):
+        """Record how late the wakeup asked for by next_wakeup_ms arrived"""
+        if self.expected_wakeup is None:
+            return
+        drift = self.clock() - self.expected_wakeup
+        self.expected_wakeup = None
+        self.wakeups += 1
+        self.last_drift = drift
+        self.max_drift = max(self.max_drift, drift)
+        self.total_drift += drift
+
+    def drift_stats(self):
+        """Wakeup lateness in seconds: last, worst and mean"""
+        return {
+            'wakeups': self.wakeups,
+            'last': self.last_drift,
+            'max': self.max_drift,
+            'mean': self.total_drift / self.wakeups if self.wakeups else 0.0
+        }
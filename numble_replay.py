@@ -0,0 +1,122 @@
+"""Compact Numble replays and batch verification.
+
+A replay is the seed, the settings and each guess with the feedback code
+it received and when it was made. Replaying regenerates the target from
+the seed and rescores every guess headlessly, so a corpus of recorded
+games can be checked against the current engine in bulk:
+
+    python numble_replay.py replays.txt ~/.numble/games.jsonl
+
+One replay encodes to a single line of text:
+
+    v1 <seed> <settings> <guess>:<code in hex>@<elapsed ms>;...
+
+Input files may mix encoded replays and stats-log records.
+"""
+import argparse
+import json
+import sys
+from collections import namedtuple
+
+from numble_engine import NumbleEngine, parse_settings_key, settings_key
+
+FORMAT_VERSION = "v1"
+
+Replay = namedtuple('Replay', 'seed digit_count allow_repeating_digits difficulty_mode guesses')
+# guesses: tuple of (guess, feedback code, seconds into the game)
+
+
+def record_replay(engine):
+    """Replay of the engine's current game"""
+    if engine.seed is None:
+        raise ValueError("Only seeded games can be replayed.")
+    return Replay(
+        engine.seed, *engine.game_settings,
+        tuple((item['guess'], item['code'], item['elapsed']) for item in engine.guess_history)
+    )
+
+
+def replay_from_record(record):
+    """Replay of a stats-log game record"""
+    return Replay(
+        record['seed'], record['digit_count'], record['allow_repeating_digits'], record['difficulty_mode'],
+        tuple((guess, code, elapsed) for guess, elapsed, code in record['guesses'])
+    )
+
+
+def encode_replay(replay):
+    settings = settings_key(replay.digit_count, replay.allow_repeating_digits, replay.difficulty_mode)
+    guesses = ';'.join(f"{guess}:{code:x}@{round(elapsed * 1000)}" for guess, code, elapsed in replay.guesses)
+    return f"{FORMAT_VERSION} {replay.seed} {settings} {guesses}".rstrip()
+
+
+def decode_replay(line):
+    version, seed, settings, *rest = line.split()
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported replay version: {version}")
+    guesses = []
+    for token in rest[0].split(';') if rest else ():
+        guess, _, token = token.partition(':')
+        code, _, elapsed = token.partition('@')
+        guesses.append((guess, int(code, 16), int(elapsed) / 1000))
+    return Replay(int(seed), *parse_settings_key(settings), tuple(guesses))
+
+
+def verify_replay(replay, engine=None):
+    """Re-execute a replay; returns a description of the first divergence, or None"""
+    engine = engine or NumbleEngine()
+    engine.digit_count = replay.digit_count
+    engine.allow_repeating_digits = replay.allow_repeating_digits
+    engine.difficulty_mode = replay.difficulty_mode
+    engine.new_game(seed=replay.seed)
+
+    for turn, (guess, code, _) in enumerate(replay.guesses, 1):
+        if engine.game_over:
+            return f"guess {turn}: game already won"
+        try:
+            result = engine.submit_guess(guess)
+        except ValueError as e:
+            return f"guess {turn} ({guess}): {e}"
+        if result['code'] != code:
+            return f"guess {turn} ({guess}): feedback {result['code']:x}, recorded {code:x}"
+    return None
+
+
+def read_replays(path):
+    """Stream replays from a file of encoded replays and/or stats-log records"""
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                record = json.loads(line)
+                if record.get('seed') is not None:
+                    yield replay_from_record(record)
+            else:
+                yield decode_replay(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify recorded Numble games against the current engine")
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--max-reports', type=int, default=20, help="divergences to print")
+    args = parser.parse_args(argv)
+
+    engine = NumbleEngine()
+    checked = diverged = 0
+    for path in args.paths:
+        for replay in read_replays(path):
+            checked += 1
+            problem = verify_replay(replay, engine)
+            if problem:
+                diverged += 1
+                if diverged <= args.max_reports:
+                    print(f"{encode_replay(replay)}\n    {problem}")
+
+    print(f"{checked} games replayed, {diverged} diverged")
+    return 1 if diverged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
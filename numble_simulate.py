@@ -0,0 +1,244 @@
+"""Monte Carlo simulator for calibrating Numble par scores.
+
+Plays a strategy against every possible target, or a random sample of
+them, for each combination of digit count, repeat setting and difficulty
+mode, spread over a process pool. Results are streamed back as per-chunk
+histograms of guess counts and appended to a checkpoint file, so an
+interrupted run picks up where it stopped when started again with the
+same checkpoint and options. Each checkpointed chunk is tagged with the
+options that shape its results (strategy, sample size, seed, guess
+limit); chunks from a run with different options are ignored.
+
+    python numble_simulate.py --digits 4 5 --sample 2000 --checkpoint sim.jsonl
+
+A strategy is named as `module:function`. The function is called once
+per chunk with (digit_count, allow_repeating_digits, difficulty_mode,
+seed), the seed derived from the run's seed and the chunk, and must
+return a callable that takes a NumbleEngine mid-game and returns the
+next guess. A chunk's results therefore don't depend on which worker
+plays it or what that worker played before. The default strategy
+plays NumbleSolver's suggestions.
+
+Games are scored through the feedback tables in numble_table where the
+space has a stored one (3 digits, and 4 digits without repeats). Those
+tables are built before the workers start, so each is built once and
+every worker maps the cached file.
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import zlib
+from collections import Counter
+from itertools import product
+from multiprocessing import Pool
+
+from numble_engine import DIFFICULTY_MODES, MAX_DIGITS, MIN_DIGITS, NumbleEngine, all_numbers, settings_key
+from numble_table import get_table
+
+DEFAULT_STRATEGY = "numble_simulate:solver_strategy"
+CHUNK_SIZE = 64
+
+
+def solver_strategy(digit_count, allow_repeating_digits, difficulty_mode, seed=None):
+    """Play the solver's most informative guess every turn"""
+    from numble_solver import NumbleSolver
+    solver = NumbleSolver(digit_count, allow_repeating_digits, difficulty_mode, seed=seed,
+                          use_feedback_table=True)
+
+    def next_guess(engine):
+        solver.sync(engine)
+        return solver.suggest()
+    return next_guess
+
+
+def load_table(digit_count, allow_repeating_digits):
+    """Load the stored feedback table for the settings, building it if needed;
+    returns whether games can be scored through it"""
+    table = get_table(digit_count, allow_repeating_digits)
+    if not table.stored:
+        return False
+    try:
+        table.load()
+    except OSError as e:
+        print(f"Scoring {digit_count}-digit games directly: {e}", file=sys.stderr)
+        return False
+    return True
+
+
+def load_strategy(name):
+    module_name, _, function_name = name.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def play_game(engine, next_guess, target, max_guesses):
+    """Play one game; returns the guess count, or None if it gave up"""
+    engine.new_game(target)
+    while not engine.game_over:
+        if len(engine.guess_history) >= max_guesses:
+            return None
+        engine.submit_code(next_guess(engine))
+    return len(engine.guess_history)
+
+
+def plan_tasks(configs, sample, seed):
+    """Split every configuration's targets into fixed, reproducible chunks"""
+    tasks = []
+    for digit_count, allow_repeating_digits, difficulty_mode in configs:
+        targets = all_numbers(digit_count, allow_repeating_digits)
+        if sample and sample < len(targets):
+            rng = random.Random(f"{seed}/{digit_count}/{allow_repeating_digits}")
+            targets = rng.sample(targets, sample)
+        for chunk, start in enumerate(range(0, len(targets), CHUNK_SIZE)):
+            tasks.append((digit_count, allow_repeating_digits, difficulty_mode,
+                          chunk, targets[start:start + CHUNK_SIZE]))
+    return tasks
+
+
+def run_key(strategy_name, sample, seed, max_guesses):
+    """Label for the options a run's results depend on, stored with each chunk"""
+    return f"{strategy_name}/sample={sample}/seed={seed}/max={max_guesses}"
+
+
+def _init_worker(strategy_name, max_guesses, seed):
+    global _strategy_factory, _max_guesses, _seed
+    _strategy_factory = load_strategy(strategy_name)
+    _max_guesses = max_guesses
+    _seed = seed
+
+
+def run_chunk(task):
+    """Worker: play one chunk of targets and return its histogram"""
+    digit_count, allow_repeating_digits, difficulty_mode, chunk, targets = task
+    settings = (digit_count, allow_repeating_digits, difficulty_mode)
+    seed = zlib.crc32(f"{_seed}/{settings_key(*settings)}/{chunk}".encode())
+    use_table = load_table(digit_count, allow_repeating_digits)
+    next_guess = _strategy_factory(*settings, seed=seed)
+
+    engine = NumbleEngine(digit_count, allow_repeating_digits, difficulty_mode, use_feedback_table=use_table)
+    histogram = Counter()
+    for target in targets:
+        guesses = play_game(engine, next_guess, target, _max_guesses)
+        histogram[str(guesses) if guesses else 'failed'] += 1
+    return settings_key(*settings), chunk, dict(histogram)
+
+
+def load_checkpoint(path, run):
+    """Histograms per configuration and the chunks already done by this run,
+    and how many checkpointed chunks belong to other runs"""
+    done = set()
+    histograms = {}
+    foreign = 0
+    if not path or not os.path.exists(path):
+        return done, histograms, foreign
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            if record.get('run') != run:
+                foreign += 1
+                continue
+            key = (record['config'], record['chunk'])
+            if key in done:
+                continue
+            done.add(key)
+            histograms.setdefault(record['config'], Counter()).update(record['histogram'])
+    return done, histograms, foreign
+
+
+def histogram_median(counts, games):
+    """Median of a sorted (value, frequency) histogram without expanding it"""
+    lower = upper = None
+    seen = 0
+    for value, n in counts:
+        seen += n
+        if lower is None and seen >= (games + 1) // 2:
+            lower = value
+        if seen >= games // 2 + 1:
+            upper = value
+            break
+    return (lower + upper) / 2
+
+
+def summarize(histograms, keys):
+    """Guess-count distribution and recommended par per configuration"""
+    report = {}
+    for key in keys:
+        histogram = histograms.get(key, {})
+        failed = histogram.get('failed', 0)
+        counts = sorted((int(guesses), n) for guesses, n in histogram.items() if guesses != 'failed')
+        games = sum(n for _, n in counts)
+        median = histogram_median(counts, games) if games else None
+        report[key] = {
+            'games': games + failed,
+            'failed': failed,
+            'distribution': {str(guesses): n for guesses, n in counts},
+            'mean': round(sum(guesses * n for guesses, n in counts) / games, 3) if games else None,
+            'median': median,
+            # Par is the guess count a typical game is solved in
+            'recommended_par': round(median) if games else None,
+        }
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--digits', type=int, nargs='+', default=list(range(MIN_DIGITS, MAX_DIGITS + 1)),
+                        choices=range(MIN_DIGITS, MAX_DIGITS + 1))
+    parser.add_argument('--repeats', choices=('unique', 'repeat', 'both'), default='both')
+    parser.add_argument('--modes', nargs='+', default=list(DIFFICULTY_MODES), choices=DIFFICULTY_MODES)
+    parser.add_argument('--sample', type=int, default=1000,
+                        help="random targets per configuration (0 plays every target)")
+    parser.add_argument('--strategy', default=DEFAULT_STRATEGY, help="module:function strategy factory")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-guesses', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--checkpoint', help="JSON Lines file to append results to and resume from")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    repeats = {'unique': [False], 'repeat': [True], 'both': [False, True]}[args.repeats]
+    configs = list(product(args.digits, repeats, args.modes))
+
+    run = run_key(args.strategy, args.sample, args.seed, args.max_guesses)
+    done, histograms, foreign = load_checkpoint(args.checkpoint, run)
+    if foreign:
+        print(f"Ignoring {foreign} checkpointed chunks from runs with other options", file=sys.stderr)
+    tasks = [task for task in plan_tasks(configs, args.sample, args.seed)
+             if (settings_key(*task[:3]), task[3]) not in done]
+    print(f"{len(tasks)} chunks to play ({len(done)} already checkpointed)", file=sys.stderr)
+    for digit_count, allow_repeating_digits in sorted({task[:2] for task in tasks}):
+        load_table(digit_count, allow_repeating_digits)
+
+    checkpoint = open(args.checkpoint, 'a') if args.checkpoint else None
+    try:
+        with Pool(args.workers, _init_worker, (args.strategy, args.max_guesses, args.seed)) as pool:
+            for finished, (key, chunk, histogram) in enumerate(pool.imap_unordered(run_chunk, tasks), 1):
+                histograms.setdefault(key, Counter()).update(histogram)
+                if checkpoint:
+                    record = {'run': run, 'config': key, 'chunk': chunk, 'histogram': histogram}
+                    checkpoint.write(json.dumps(record) + '\n')
+                    checkpoint.flush()
+                if finished % 50 == 0:
+                    print(f"  {finished}/{len(tasks)} chunks", file=sys.stderr)
+    finally:
+        if checkpoint:
+            checkpoint.close()
+
+    report = json.dumps(summarize(histograms, [settings_key(*config) for config in configs]), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
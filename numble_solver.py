@@ -0,0 +1,171 @@
+"""Entropy-maximizing Numble solver and hint engine.
+
+`NumbleSolver` keeps the set of targets still consistent with the guesses
+made so far as a NumPy array of indices into `all_digits`, narrowing it
+after every guess rather than refiltering from scratch. Suggestions
+maximize the expected information of the feedback the current
+difficulty mode actually reveals: lock counts in hard mode, lock and
+unlock counts in standard mode, and per-position symbols in easy mode
+(or in standard mode with symbol positions shown).
+
+With `use_feedback_table`, feedback comes from the stored table in
+numble_table where the space has one (3 digits, and 4 digits without
+repeats) instead of being scored, which is several times faster than
+`score_batch`. The table loads in the background; until it is ready the
+solver scores directly, with the same results.
+
+Requires numpy.
+"""
+from numble_engine import (
+    MASK_BITS, all_digits, all_numbers, np, score_batch, unpack_codes, _require_numpy
+)
+from numble_table import get_table, number_index
+
+# Guess/target pairs scored per suggestion; keeps 6 digits with repeats
+# well under 50 ms
+MAX_SCORED_PAIRS = 1 << 16
+MAX_SAMPLED_TARGETS = 2048
+
+
+def observation_keys(batch, difficulty_mode, show_positions=False):
+    """What a player gets to see of each feedback in the given mode"""
+    if difficulty_mode == "easy" or (difficulty_mode == "standard" and show_positions):
+        return batch.codes
+    if difficulty_mode == "hard":
+        return batch.locks.astype(np.uint16)
+    return batch.locks.astype(np.uint16) | (batch.unlocks.astype(np.uint16) << MASK_BITS)
+
+
+def observation_key(code, difficulty_mode, show_positions=False):
+    """observation_keys for a single packed feedback code"""
+    locks = bin(code & ((1 << MASK_BITS) - 1)).count('1')
+    if difficulty_mode == "easy" or (difficulty_mode == "standard" and show_positions):
+        return code
+    if difficulty_mode == "hard":
+        return locks
+    return locks | (bin(code >> MASK_BITS).count('1') << MASK_BITS)
+
+
+class NumbleSolver:
+    def __init__(self, digit_count=4, allow_repeating_digits=False,
+                 difficulty_mode="standard", show_positions=False, seed=None,
+                 use_feedback_table=False):
+        _require_numpy()
+        self.digit_count = digit_count
+        self.allow_repeating_digits = allow_repeating_digits
+        self.difficulty_mode = difficulty_mode
+        self.show_positions = show_positions
+        self.rng = np.random.default_rng(seed)
+        self.use_feedback_table = use_feedback_table
+
+        self.numbers = all_numbers(digit_count, allow_repeating_digits)
+        self.digits = all_digits(digit_count, allow_repeating_digits)
+        table = get_table(digit_count, allow_repeating_digits) if use_feedback_table else None
+        self.table = table if table is not None and table.stored else None
+        self._codes = None
+        if self.table is not None:
+            self.table.prepare()
+            # Observation key of every possible code, so table codes map to keys in one gather
+            self._code_keys = observation_keys(unpack_codes(np.arange(1 << (2 * MASK_BITS))),
+                                               difficulty_mode, show_positions)
+        self.reset()
+
+    def reset(self):
+        """Forget all guesses; every number is a candidate again"""
+        self.candidates = np.arange(len(self.digits), dtype=np.uint32)
+        self.guesses = []
+
+    @property
+    def remaining(self):
+        return len(self.candidates)
+
+    def candidate_numbers(self, limit=None):
+        return [self.numbers[i] for i in self.candidates[:limit]]
+
+    def add_guess(self, guess, code):
+        """Narrow the candidates to those that would have produced this feedback"""
+        guess_index = number_index(guess, self.allow_repeating_digits)
+        keys = self._observe(guess_index, self.candidates)
+        observed = observation_key(code, self.difficulty_mode, self.show_positions)
+        self.candidates = self.candidates[keys == observed]
+        self.guesses.append((guess, code))
+
+    def sync(self, engine, show_positions=False):
+        """Catch up with an engine's guess history, pruning only for new guesses"""
+        settings = (engine.digit_count, engine.allow_repeating_digits,
+                    engine.difficulty_mode, show_positions)
+        current = (self.digit_count, self.allow_repeating_digits,
+                   self.difficulty_mode, self.show_positions)
+        if settings != current:
+            self.__init__(*settings, use_feedback_table=self.use_feedback_table)
+
+        history = engine.guess_history
+        known = [guess for guess, _ in self.guesses]
+        if known != [item['guess'] for item in history[:len(known)]]:
+            # A different game: start over
+            self.reset()
+        for item in history[len(self.guesses):]:
+            self.add_guess(item['guess'], item['code'])
+
+    def _observe(self, guesses, targets):
+        """Observation keys for a guess index (or an array of them) against
+        an array of target indices, shaped like score_batch's result"""
+        table_codes = self._table_codes()
+        if table_codes is not None:
+            # Gathering by flat position is about twice as fast as 2-D fancy indexing
+            pairs = np.asarray(guesses, dtype=np.intp)[..., None] * len(self.numbers) + targets
+            return self._code_keys[table_codes.take(pairs)]
+
+        guess_digits, target_digits = self.digits[guesses], self.digits[targets]
+        if self.difficulty_mode == "hard":
+            # Lock counts alone are much cheaper than a full batch score
+            return (guess_digits[..., None, :] == target_digits).sum(axis=-1, dtype=np.uint16)
+        return observation_keys(score_batch(guess_digits, target_digits), self.difficulty_mode, self.show_positions)
+
+    def _table_codes(self):
+        """The stored feedback table, flattened, once it has loaded; else None"""
+        if self._codes is None and self.table is not None and self.table.ready:
+            self._codes = np.asarray(self.table.matrix()).reshape(-1)
+        return self._codes
+
+    def suggest(self):
+        """The guess with the highest expected information, as a string"""
+        candidates = self.candidates
+        if len(candidates) == 0:
+            return None
+        if len(candidates) <= 2:
+            return self.numbers[candidates[0]]
+
+        # Estimate partitions on a sample of the candidates...
+        if len(candidates) > MAX_SAMPLED_TARGETS:
+            targets = candidates[self.rng.integers(len(candidates), size=MAX_SAMPLED_TARGETS)]
+        else:
+            targets = candidates
+
+        # ...for as many guesses as the pair budget allows, preferring
+        # candidates (which might win outright) and topping up with other
+        # numbers when the candidate set is small
+        pool_size = max(1, MAX_SCORED_PAIRS // len(targets))
+        if len(candidates) > pool_size:
+            pool = np.unique(candidates[self.rng.integers(len(candidates), size=pool_size)])
+            is_candidate = np.ones(len(pool), dtype=bool)
+        else:
+            extra = self.rng.integers(len(self.digits), size=pool_size - len(candidates))
+            extra = np.setdiff1d(extra, candidates).astype(np.uint32)
+            pool = np.concatenate([candidates, extra])
+            is_candidate = np.arange(len(pool)) < len(candidates)
+
+        keys = self._observe(pool, targets)
+
+        # Entropy of each guess's partition of the sampled targets
+        key_space = 1 << (2 * MASK_BITS)
+        rows = np.arange(len(pool), dtype=np.int64)[:, None]
+        groups, sizes = np.unique((keys + rows * key_space).ravel(), return_counts=True)
+        sizes = sizes.astype(np.float64)
+        weighted = np.bincount(groups // key_space, weights=sizes * np.log2(sizes), minlength=len(pool))
+        total = len(targets)
+        entropy = np.log2(total) - weighted / total
+
+        # A candidate guess might also be the answer
+        entropy += is_candidate / len(candidates)
+        return self.numbers[pool[int(np.argmax(entropy))]]
@@ -0,0 +1,149 @@
+"""Crash-safe Numble stats store.
+
+Every finished or abandoned game is appended as one JSON line to
+`games.jsonl` (settings, seed, target, guesses with their times and
+feedback codes, outcome) and fsynced, so a crash can lose at most the
+game being written. Aggregate stats, overall and per settings, are kept
+up to date as games are recorded and snapshotted atomically to
+`stats.json` together with the log offset they cover. Loading reads the
+snapshot and replays only the few records after it, so startup cost
+does not grow with the log.
+"""
+import json
+import os
+import time
+
+from numble_engine import settings_key
+
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), ".numble")
+LEGACY_STATS_FILE = 'numble_stats.json'
+
+# Games recorded between snapshots (and so replayed at most on load)
+SNAPSHOT_INTERVAL = 16
+
+
+def empty_stats():
+    return {
+        'games_played': 0,
+        'games_won': 0,
+        'current_streak': 0,
+        'best_streak': 0,
+        'total_guesses': 0,
+        'best_score': float('inf'),
+        'guess_distribution': {}
+    }
+
+
+def apply_game(stats, record):
+    """Fold one game record into an aggregate stats dict"""
+    stats['games_played'] += 1
+    if record['outcome'] != 'won':
+        stats['current_streak'] = 0
+        return
+    guess_count = len(record['guesses'])
+    stats['games_won'] += 1
+    stats['current_streak'] += 1
+    stats['best_streak'] = max(stats['current_streak'], stats['best_streak'])
+    stats['total_guesses'] += guess_count
+    stats['best_score'] = min(stats['best_score'], guess_count)
+    distribution = stats.setdefault('guess_distribution', {})
+    distribution[str(guess_count)] = distribution.get(str(guess_count), 0) + 1
+
+
+def game_record(engine, outcome, **extra):
+    """Log record for the engine's current game"""
+    digit_count, allow_repeating_digits, difficulty_mode = engine.game_settings
+    record = {
+        'started': round(engine.started_at, 3),
+        'digit_count': digit_count,
+        'allow_repeating_digits': allow_repeating_digits,
+        'difficulty_mode': difficulty_mode,
+        'seed': engine.seed,
+        'target': engine.target_number,
+        'guesses': [[item['guess'], round(item['elapsed'], 3), item['code']] for item in engine.guess_history],
+        'duration': round(engine.elapsed(), 3),
+        'outcome': outcome
+    }
+    record.update(extra)
+    return record
+
+
+class StatsStore:
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        self.data_dir = data_dir
+        self.log_path = os.path.join(data_dir, 'games.jsonl')
+        self.snapshot_path = os.path.join(data_dir, 'stats.json')
+
+        self.stats = empty_stats()
+        self.by_settings = {}
+        self.log_offset = 0
+        self.unsnapshotted = 0
+
+    def load(self):
+        """Restore aggregates from the snapshot plus the log records after it"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            self.stats = snapshot['stats']
+            self.by_settings = snapshot['by_settings']
+            self.log_offset = snapshot['log_offset']
+        elif os.path.exists(LEGACY_STATS_FILE):
+            # Carry over the aggregate-only stats of older versions
+            with open(LEGACY_STATS_FILE, 'r') as f:
+                self.stats.update(json.load(f))
+
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'rb+') as log:
+            log.seek(self.log_offset)
+            for line in log:
+                if not line.endswith(b'\n'):
+                    # A record cut short by a crash: drop it
+                    log.truncate(self.log_offset)
+                    break
+                self._apply(json.loads(line))
+                self.log_offset += len(line)
+                self.unsnapshotted += 1
+
+    def record_game(self, record):
+        """Append a game to the log and fold it into the aggregates"""
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+        with open(self.log_path, 'ab') as log:
+            log.write(line)
+            log.flush()
+            os.fsync(log.fileno())
+        self._apply(record)
+        self.log_offset += len(line)
+        self.unsnapshotted += 1
+        if self.unsnapshotted >= SNAPSHOT_INTERVAL:
+            self.snapshot()
+
+    def snapshot(self):
+        """Atomically write the aggregates and the log offset they cover"""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'log_offset': self.log_offset,
+                'stats': self.stats,
+                'by_settings': self.by_settings,
+                'saved': time.time()
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self.unsnapshotted = 0
+
+    def games(self):
+        """Stream every logged game record, oldest first"""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'r') as log:
+            for line in log:
+                if line.endswith('\n'):
+                    yield json.loads(line)
+
+    def _apply(self, record):
+        apply_game(self.stats, record)
+        key = settings_key(record['digit_count'], record['allow_repeating_digits'], record['difficulty_mode'])
+        apply_game(self.by_settings.setdefault(key, empty_stats()), record)
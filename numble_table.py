@@ -0,0 +1,231 @@
+"""Precomputed Numble feedback tables.
+
+A `FeedbackTable` holds the packed feedback code (see
+`numble_engine.score_guess`) for every guess/target pair of one digit
+count and repeat mode, so scoring becomes a single index lookup.
+
+Spaces small enough to store whole (3 digits, and 4 digits without
+repeats) are built once, cached on disk and memory-mapped. Building
+takes seconds, so `score` starts it on a background thread and scores
+directly with `score_guess` until the table is ready. Larger spaces
+cannot be stored in full - 6 digits with repeats would need 10^12
+entries - so their rows are computed on first use and kept in a bounded
+in-memory cache instead; `score` on those falls back to `score_guess`
+for rows that aren't cached. The codes are the same either way, only
+the speed differs.
+
+NumbleSolver and the simulator use the stored tables where they exist.
+"""
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+
+from numble_engine import all_digits, all_numbers, np, score_batch, score_guess, _require_numpy
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "numble")
+
+# Largest table (in entries) written to disk: 2 bytes each, so 64 MiB
+MAX_TABLE_ENTRIES = 1 << 25
+
+# Rows kept in memory for spaces too large to store whole
+MAX_CACHED_ROWS = 256
+
+_HEADER = struct.Struct("=4sHBBI")
+_MAGIC = b"NMBL"
+_BYTE_ORDER_MARK = 0x0102
+
+
+def number_index(number, allow_repeating_digits):
+    """Position of a number in `all_numbers` order"""
+    if allow_repeating_digits:
+        return int(number)
+    return _permutation_index(len(number))[number]
+
+
+_permutation_indexes = {}
+
+
+def _permutation_index(digit_count):
+    index = _permutation_indexes.get(digit_count)
+    if index is None:
+        numbers = all_numbers(digit_count, False)
+        index = _permutation_indexes[digit_count] = dict(zip(numbers, range(len(numbers))))
+    return index
+
+
+def build_row(guess, digit_count, allow_repeating_digits):
+    """Feedback codes for one guess against every number"""
+    row = array('H')
+    if np is not None:
+        codes = score_batch(guess, all_digits(digit_count, allow_repeating_digits)).codes
+        row.frombytes(codes.tobytes())
+    else:
+        row.extend(score_guess(guess, target) for target in all_numbers(digit_count, allow_repeating_digits))
+    return row
+
+
+class FeedbackTable:
+    def __init__(self, digit_count, allow_repeating_digits, cache_dir=DEFAULT_CACHE_DIR):
+        self.digit_count = digit_count
+        self.allow_repeating_digits = allow_repeating_digits
+        self.numbers = all_numbers(digit_count, allow_repeating_digits)
+        self.size = len(self.numbers)
+        self.cache_dir = cache_dir
+        self.stored = self.size * self.size <= MAX_TABLE_ENTRIES
+
+        self._codes = None
+        self._mmap = None
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()  # one load or build at a time
+        self._loader = None
+
+    @property
+    def path(self):
+        mode = "repeat" if self.allow_repeating_digits else "unique"
+        return os.path.join(self.cache_dir, f"feedback_{self.digit_count}_{mode}.bin")
+
+    def index(self, number):
+        return number_index(number, self.allow_repeating_digits)
+
+    def score(self, guess, target):
+        """Feedback code for a guess against a target; never waits for the
+        stored table to be built.
+
+        Falls back to `score_guess` while a stored table is loading and for
+        rows of an unstored space that aren't cached, so a lookup is only
+        guaranteed once `ready` is true.
+        """
+        if self.stored:
+            if self._codes is None:
+                self.prepare()
+                return score_guess(guess, target)
+            return self._codes[self.index(guess) * self.size + self.index(target)]
+        # Don't build a whole row just to score a single pair
+        row = self._rows.get(self.index(guess))
+        if row is None:
+            return score_guess(guess, target)
+        return row[self.index(target)]
+
+    @property
+    def ready(self):
+        """Whether the stored table is loaded, so lookups don't compute"""
+        return self._codes is not None
+
+    def matrix(self):
+        """The stored table as a read-only (guess, target) numpy array,
+        loading it first if needed.
+
+        The array maps the file separately, so it stays valid after close().
+        """
+        _require_numpy()
+        self.load()
+        return np.memmap(self.path, dtype=np.uint16, mode='r', offset=_HEADER.size,
+                         shape=(self.size, self.size))
+
+    def lookup(self, guess_index, target_index):
+        if self.stored:
+            if self._codes is None:
+                self.load()
+            return self._codes[guess_index * self.size + target_index]
+        return self.row(guess_index)[target_index]
+
+    def row(self, guess_index):
+        """Codes for one guess against every target, as an array indexed by target"""
+        if self.stored:
+            if self._codes is None:
+                self.load()
+            # Copied out of the mapping, so the table can be closed while rows are held
+            start = _HEADER.size + 2 * guess_index * self.size
+            row = array('H')
+            row.frombytes(self._mmap[start:start + 2 * self.size])
+            return row
+
+        row = self._rows.get(guess_index)
+        if row is None:
+            row = self._rows[guess_index] = build_row(
+                self.numbers[guess_index], self.digit_count, self.allow_repeating_digits)
+            if len(self._rows) > MAX_CACHED_ROWS:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(guess_index)
+        return row
+
+    def load(self):
+        """Memory-map the stored table, building it first if needed"""
+        if not self.stored:
+            raise ValueError(f"A {self.digit_count}-digit table is too large to store whole.")
+        with self._lock:
+            if self._codes is not None:
+                return
+            if not self._open():
+                self.build()
+                if not self._open():
+                    raise OSError(f"Could not load feedback table from {self.path}")
+
+    def prepare(self):
+        """Load the stored table on a background thread, building it if needed"""
+        if self._codes is None and self._loader is None:
+            self._loader = threading.Thread(target=self._load_in_background, name="feedback-table", daemon=True)
+            self._loader.start()
+
+    def _load_in_background(self):
+        try:
+            self.load()
+        except OSError as e:
+            # score() keeps computing codes directly
+            print(f"Could not load feedback table: {e}")
+
+    def build(self):
+        """Compute the whole table and write it to the cache atomically"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _BYTE_ORDER_MARK, self.digit_count,
+                                 self.allow_repeating_digits, self.size))
+            for guess in self.numbers:
+                build_row(guess, self.digit_count, self.allow_repeating_digits).tofile(f)
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        if self._loader is not None:
+            self._loader.join()
+            self._loader = None
+        if self._codes is not None:
+            self._codes.release()
+            self._codes = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _open(self):
+        try:
+            with open(self.path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+
+        expected = (_MAGIC, _BYTE_ORDER_MARK, self.digit_count, self.allow_repeating_digits, self.size)
+        if (len(mapped) != _HEADER.size + 2 * self.size * self.size
+                or _HEADER.unpack_from(mapped) != expected):
+            # Stale, truncated or foreign-endian file: rebuild it
+            mapped.close()
+            return False
+
+        self._mmap = mapped
+        self._codes = memoryview(mapped)[_HEADER.size:].cast('H')
+        return True
+
+
+_tables = {}
+
+
+def get_table(digit_count, allow_repeating_digits):
+    """Shared table for the settings, created on first use"""
+    key = (digit_count, bool(allow_repeating_digits))
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = FeedbackTable(*key, cache_dir=DEFAULT_CACHE_DIR)
+    return table
@@ -0,0 +1,125 @@
+import random
+
+import pytest
+
+from duckhunt_core import Duck, DuckHuntSim, DuckSwarm, DuckSwarmSim, SpatialGrid, np
+
+
+def place_ducks(sim, positions):
+    """Replace the flying ducks with stationary ones at the given points"""
+    ducks = [Duck(i, x, y, 0, 0) for i, (x, y) in enumerate(positions)]
+    if isinstance(sim, DuckSwarmSim):
+        sim.ducks.clear()
+        for duck in ducks:
+            sim.ducks.add(duck)
+    else:
+        sim.ducks[:] = ducks
+
+
+def hit_ids(sim):
+    return {duck.id for duck in sim.duck_snapshots() if duck.hit}
+
+
+@pytest.mark.parametrize('swarm', [False, pytest.param(True, marks=pytest.mark.skipif(
+    np is None, reason="numpy not installed"))])
+def test_shot_hits_nearest_duck_in_both_modes(swarm):
+    sim = DuckSwarmSim(rng=random.Random(0), swarm_size=10) if swarm else DuckHuntSim(rng=random.Random(0))
+    sim.start()
+    # Overlapping ducks: the later one in list order is nearer the shot
+    place_ducks(sim, [(100, 100), (120, 100)])
+    assert sim.shoot(115, 100)
+    assert hit_ids(sim) == {1}
+    # The next shot at the same point takes the other duck
+    assert sim.shoot(115, 100)
+    assert hit_ids(sim) == {0, 1}
+
+
+def test_miss_outside_every_duck():
+    sim = DuckHuntSim(rng=random.Random(0))
+    sim.start()
+    place_ducks(sim, [(100, 100)])
+    assert not sim.shoot(100, 100 + sim.ducks[0].size + 1)
+    assert hit_ids(sim) == set()
+
+
+needs_numpy = pytest.mark.skipif(np is None, reason="numpy not installed")
+
+
+@needs_numpy
+def test_swarm_steps_like_scalar_ducks():
+    rng = random.Random(4)
+    width, height = 800, 600
+    scalar = [Duck.spawn(i, rng, width, height, (2, 12)) for i in range(200)]
+    # The ceiling turns back anything slower, so these are the ones that escape
+    scalar += [Duck(200 + i, 100 + 50 * i, 100, 3, -200 - 50 * i) for i in range(5)]
+    swarm = DuckSwarm(8, width=width, height=height)  # grows as ducks are added
+    for duck in scalar:
+        swarm.add(duck)
+
+    escaped_total = fallen_total = 0
+    for step in range(2000):
+        if step % 50 == 25 and scalar:
+            # Shoot one down in both, so falling is covered too
+            duck = scalar[rng.randrange(len(scalar))]
+            duck.hit = True
+            swarm.hit[np.flatnonzero(swarm.ids[:swarm.count] == duck.id)] = True
+        for duck in scalar:
+            duck.move(width, height)
+        escaped = sum(1 for duck in scalar if not duck.alive and not duck.hit)
+        fallen = sum(1 for duck in scalar if not duck.alive and duck.hit)
+        scalar = [duck for duck in scalar if duck.alive]
+        assert swarm.move(width, height) == (escaped, fallen)
+        escaped_total += escaped
+        fallen_total += fallen
+
+        expected = {duck.id: (duck.x, duck.y, duck.prev_x, duck.prev_y, duck.hit) for duck in scalar}
+        assert {duck.id: tuple(duck[1:]) for duck in swarm.snapshot()} == expected
+    assert escaped_total == 5 and fallen_total > 0
+
+
+@needs_numpy
+def test_grid_queries_match_a_linear_scan():
+    rng = np.random.default_rng(6)
+    grid = SpatialGrid(800, 600, 40)
+    for _ in range(20):
+        count = int(rng.integers(0, 400))
+        x = rng.uniform(-100, 900, count)
+        y = rng.uniform(-100, 700, count)
+        grid.build(x, y)
+        qx = rng.uniform(-100, 900, 50)
+        qy = rng.uniform(-100, 700, 50)
+        queries, points = grid.query(qx, qy)
+        pairs = list(zip(queries.tolist(), points.tolist()))
+        assert len(pairs) == len(set(pairs))
+        near = {(q, p) for q in range(len(qx)) for p in range(count)
+                if (x[p] - qx[q]) ** 2 + (y[p] - qy[q]) ** 2 <= 40 ** 2}
+        assert near <= set(pairs)
+        for q in range(len(qx)):
+            single = set(grid.query_point(qx[q], qy[q]).tolist())
+            assert single == {p for query, p in pairs if query == q}
+
+
+@needs_numpy
+def test_hit_test_many_matches_a_linear_scan():
+    rng = random.Random(8)
+    for _ in range(30):
+        ducks = [Duck(i, rng.uniform(0, 800), rng.uniform(0, 600), 0, 0) for i in range(rng.randint(0, 300))]
+        for duck in ducks:
+            duck.hit = rng.random() < 0.2
+        swarm = DuckSwarm(width=800, height=600)
+        for duck in ducks:
+            swarm.add(duck)
+        shots = [(rng.uniform(0, 800), rng.uniform(0, 600)) for _ in range(40)]
+        # Cluster some shots on ducks, so shots compete for the same one
+        shots += [(duck.x + rng.uniform(-20, 20), duck.y) for duck in rng.sample(ducks, min(10, len(ducks)))]
+
+        expected = []
+        for x, y in shots:
+            candidates = [duck for duck in ducks if not duck.hit and duck.distance2(x, y) <= duck.size ** 2]
+            if candidates:
+                min(candidates, key=lambda duck: duck.distance2(x, y)).hit = True
+            expected.append(bool(candidates))
+
+        hits = swarm.hit_test_many(*zip(*shots)) if shots else []
+        assert list(hits) == expected
+        assert {duck.id for duck in swarm.snapshot() if duck.hit} == {duck.id for duck in ducks if duck.hit}
@@ -0,0 +1,76 @@
+import json
+import random
+from collections import Counter
+
+from duckhunt_core import DuckHuntSim
+from duckhunt_profiler import Profiler, percentile
+
+
+class FakeClock:
+    """perf_counter_ns stand-in that moves 1 µs per reading"""
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1000
+        return self.now
+
+
+def profiled_game(profiler, steps=200):
+    sim = DuckHuntSim(rng=random.Random(3))
+    profiler.instrument(sim, 'step', 'shoot')
+    sim.reset()
+    sim.start()
+    shots = 0
+    for tick in range(steps):
+        sim.step()
+        if tick % 40 == 39 and sim.game_active and sim.shots:
+            sim.shoot(400, 300)
+            shots += 1
+        profiler.frame(0.016 + tick % 4 * 0.001, 0.002, 10 + tick % 3)
+    return sim, shots
+
+
+def test_profiled_phases_are_recorded():
+    profiler = Profiler(clock=FakeClock())
+    sim, shots = profiled_game(profiler)
+    counts = Counter(name for name, _, _ in profiler.spans)
+    assert counts == {'DuckHuntSim.step': 200, 'DuckHuntSim.shoot': shots}
+    assert shots > 0
+    # Every span was timed by the clock around the call
+    assert all(duration > 0 for _, _, duration in profiler.spans)
+    starts = [start for _, start, _ in profiler.spans]
+    assert starts == sorted(starts)
+
+
+def test_ring_buffers_keep_the_latest():
+    profiler = Profiler(max_spans=50, max_frames=30, clock=FakeClock())
+    profiled_game(profiler)
+    assert len(profiler.spans) == 50
+    assert len(profiler.frames) == 30
+    assert profiler.summary()['frames'] == 30
+
+
+def test_summary_percentiles():
+    profiler = Profiler(clock=FakeClock())
+    profiled_game(profiler)
+    summary = profiler.summary()
+    assert summary['frames'] == 200
+    assert round(summary['frame_p50'], 6) == 17
+    assert round(summary['frame_p99'], 6) == 19
+    assert round(summary['work_p99'], 6) == 2
+    assert (summary['tk_calls_p50'], summary['tk_calls_p99']) == (11, 12)
+    assert Profiler().summary()['frame_p99'] is None
+    assert percentile([1, 2, 3, 4], 50) == 2
+
+
+def test_chrome_trace_export(tmp_path):
+    profiler = Profiler(clock=FakeClock())
+    _, shots = profiled_game(profiler, steps=50)
+    path = profiler.export(str(tmp_path))
+    with open(path) as f:
+        trace = json.load(f)
+    events = trace['traceEvents']
+    assert len(events) == 50 + shots
+    assert {event['name'] for event in events} <= {'DuckHuntSim.step', 'DuckHuntSim.shoot'}
+    assert all(event['ph'] == 'X' and event['dur'] > 0 and event['ts'] > 0 for event in events)
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from duckhunt_core import SPEED_RANGE, DuckHuntSim, DuckSwarmSim, np
+from duckhunt_replay import decode_recording, encode_recording, start_recording, verify_recording
+
+
+def play(sim, recorder, ticks=600, every=7):
+    """Shoot at the first flying duck every few ticks, moving the pointer between shots"""
+    for _ in range(ticks):
+        sim.step()
+        if sim.game_over:
+            break
+        ducks = [duck for duck in sim.duck_snapshots() if not duck.hit]
+        if ducks and sim.tick % every == 0:
+            x, y = round(ducks[0].x), round(ducks[0].y)
+            recorder.motion(x, y)
+            recorder.shot(x, y)
+            sim.shoot(x, y)
+        else:
+            recorder.motion(sim.tick % sim.width, 50)
+
+
+def recorded_game(sim):
+    recorder = start_recording(sim)
+    play(sim, recorder)
+    return recorder.recording()
+
+
+def test_classic_recording_verifies():
+    recording = recorded_game(DuckHuntSim(rng=random.Random(3)))
+    assert recording.score > 0
+    decoded = decode_recording(encode_recording(recording))
+    assert decoded == recording
+    assert verify_recording(decoded) is None
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+def test_swarm_recording_verifies():
+    recording = recorded_game(DuckSwarmSim(rng=random.Random(4), swarm_size=60))
+    assert recording.swarm_size == 60
+    assert verify_recording(decode_recording(encode_recording(recording))) is None
+
+
+def test_divergence_is_reported():
+    recording = recorded_game(DuckHuntSim(rng=random.Random(5)))
+    assert verify_recording(recording._replace(score=recording.score + 100)) is not None
+    assert verify_recording(recording._replace(seed=recording.seed + 1)) is not None
+
+
+def test_truncated_recording_is_rejected():
+    data = encode_recording(recorded_game(DuckHuntSim(rng=random.Random(6))))
+    with pytest.raises(ValueError):
+        decode_recording(data[:-3])
+
+
+def test_recording_after_idle_ticks_verifies():
+    # The Tk game steps its sim on the title screen before Start is pressed
+    sim = DuckHuntSim(rng=random.Random(7))
+    for _ in range(100):
+        sim.step()
+    recorder = start_recording(sim)
+    assert sim.tick == 0
+    play(sim, recorder)
+    recording = recorder.recording()
+    assert recording.score > 0
+    assert verify_recording(recording) is None
+
+
+def test_speed_range_is_recorded():
+    sim = DuckHuntSim(rng=random.Random(8))
+    sim.speed_range = (8, 16)
+    recording = recorded_game(sim)
+    decoded = decode_recording(encode_recording(recording))
+    assert decoded.speed_range == (8, 16)
+    assert verify_recording(decoded) is None
+    # Replayed at the default speed, the same inputs play out differently
+    assert verify_recording(decoded._replace(speed_range=SPEED_RANGE)) is not None
@@ -0,0 +1,148 @@
+import random
+
+import pytest
+
+from numble_engine import (
+    LOCK, UNLOCK, DeadlineTimer, NumbleEngine, all_digits, all_numbers, np, position_feedback, score_batch, score_guess
+)
+
+
+def reference_feedback(guess, target):
+    """Per-position symbols as the original Tk game computed them"""
+    symbols = [''] * len(guess)
+    matched_target = [False] * len(target)
+    for i, (g, t) in enumerate(zip(guess, target)):
+        if g == t:
+            symbols[i] = LOCK
+            matched_target[i] = True
+    for i, g in enumerate(guess):
+        if symbols[i]:
+            continue
+        for j, t in enumerate(target):
+            if not matched_target[j] and g == t:
+                symbols[i] = UNLOCK
+                matched_target[j] = True
+                break
+    return symbols
+
+
+def random_numbers(rng, digit_count, repeats, count):
+    return [rng.choice(all_numbers(digit_count, repeats)) for _ in range(count)]
+
+
+@pytest.mark.parametrize('digit_count', [3, 4, 5, 6])
+@pytest.mark.parametrize('repeats', [False, True])
+def test_score_guess_matches_reference(digit_count, repeats):
+    rng = random.Random(digit_count)
+    for guess, target in zip(*(random_numbers(rng, digit_count, repeats, 2000) for _ in range(2))):
+        assert position_feedback(score_guess(guess, target), digit_count) == reference_feedback(guess, target)
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+@pytest.mark.parametrize('digit_count', [3, 4, 6])
+@pytest.mark.parametrize('repeats', [False, True])
+def test_score_batch_matches_score_guess(digit_count, repeats):
+    rng = random.Random(digit_count)
+    guesses = random_numbers(rng, digit_count, repeats, 20)
+    targets = random_numbers(rng, digit_count, repeats, 500)
+    codes = score_batch(guesses, targets).codes
+    for row, guess in zip(codes, guesses):
+        assert row.tolist() == [score_guess(guess, target) for target in targets]
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+def test_all_digits_matches_all_numbers():
+    for digit_count, repeats in ((3, True), (4, False)):
+        numbers = [''.join(map(str, row)) for row in all_digits(digit_count, repeats)]
+        assert numbers == list(all_numbers(digit_count, repeats))
+
+
+def test_seeded_games_are_reproducible():
+    engine = NumbleEngine(5, True)
+    targets = [engine.new_game(seed=seed) for seed in range(50)]
+    assert targets == [NumbleEngine(5, True).new_game(seed=seed) for seed in range(50)]
+    assert all(len(target) == 5 for target in targets)
+    engine = NumbleEngine(4, False)
+    assert all(len(set(engine.new_game(seed=seed))) == 4 for seed in range(50))
+
+
+def test_submit_guess_detects_win():
+    engine = NumbleEngine(4, False, "hard")
+    engine.new_game("1234")
+    assert engine.submit_guess("4321")['feedback'] == "0"
+    assert not engine.game_over
+    result = engine.submit_guess("1234")
+    assert result['correct_positions'] == 4
+    assert engine.game_won and engine.game_over
+    with pytest.raises(ValueError):
+        engine.submit_guess("1234")
+
+
+def test_submit_code_matches_submit_guess():
+    formatted, packed = NumbleEngine(5, True), NumbleEngine(5, True)
+    formatted.new_game("12321")
+    packed.new_game("12321")
+    for guess in ("11111", "32123", "12321"):
+        assert packed.submit_code(guess) == formatted.submit_guess(guess)['code']
+    assert packed.game_won and packed.game_over
+    assert [item['code'] for item in packed.guess_history] == [item['code'] for item in formatted.guess_history]
+    with pytest.raises(ValueError):
+        packed.submit_code("12321")
+
+
+def test_validate_guess():
+    engine = NumbleEngine(4, False)
+    assert engine.validate_guess("123") is not None
+    assert engine.validate_guess("12a4") is not None
+    assert engine.validate_guess("1123") is not None
+    assert engine.validate_guess("1234") is None
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_timer_counts_down_to_expiry():
+    clock = FakeClock()
+    timer = DeadlineTimer(30, clock=clock)
+    assert timer.seconds_left() == 30
+    assert timer.next_wakeup_ms() == 1000
+    clock.now += 0.4
+    assert timer.seconds_left() == 30
+    assert timer.next_wakeup_ms() == 600  # when the count shows 29
+    clock.now += 29.6
+    assert timer.remaining() == pytest.approx(0)
+    assert timer.seconds_left() == 0
+    clock.now += 5
+    assert timer.seconds_left() == 0
+    assert timer.next_wakeup_ms() == 0
+
+
+def test_deadline_timer_reset_moves_the_deadline():
+    clock = FakeClock()
+    timer = DeadlineTimer(30, clock=clock)
+    clock.now += 20
+    timer.reset()
+    assert timer.remaining() == 30
+    clock.now += 29
+    assert timer.seconds_left() == 1
+
+
+def test_deadline_timer_drift():
+    clock = FakeClock()
+    timer = DeadlineTimer(30, clock=clock)
+    timer.woke()  # nothing was scheduled
+    assert timer.drift_stats()['wakeups'] == 0
+    for late in (0.01, 0.03):
+        delay = timer.next_wakeup_ms()
+        clock.now += delay / 1000 + late
+        timer.woke()
+    stats = timer.drift_stats()
+    assert stats['wakeups'] == 2
+    assert stats['last'] == pytest.approx(0.03)
+    assert stats['max'] == pytest.approx(0.03)
+    assert stats['mean'] == pytest.approx(0.02)
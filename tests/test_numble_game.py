@@ -0,0 +1,156 @@
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+import numble
+from numble import NumbleGame
+from numble_engine import DeadlineTimer, NumbleEngine
+from numble_stats import StatsStore
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def headless_game(tmp_path, clock=None):
+    """A NumbleGame with its Tk widgets mocked out"""
+    game = object.__new__(NumbleGame)
+    game.root = mock.MagicMock()
+    game.engine = NumbleEngine()
+    game.solver = None
+    game.solver_error = None
+    game.history_lines = {}
+    game.stats_store = StatsStore(str(tmp_path))
+    game.show_symbol_positions = False
+    game.speed_mode = False
+    game.daily_mode = False
+    game.speed_timer = DeadlineTimer(clock=clock or FakeClock())
+    game.timer_text = "Time: 30s"
+    game.timer_running = False
+    game.timer_id = None
+    for widget in ('entry', 'error_label', 'result_frame', 'history_text', 'guess_button', 'hint_button',
+                   'timer_frame', 'timer_label', 'instructions_text', 'speed_var'):
+        setattr(game, widget, mock.MagicMock())
+    game.result_frame.winfo_children.return_value = []
+    game.prepare_solver = lambda: None
+    game.reset_game()
+    return game
+
+
+def scheduled(game):
+    """(ms, callback) of each root.after call so far"""
+    return [call.args for call in game.root.after.call_args_list]
+
+
+def test_speed_mode_keystrokes_move_the_deadline_without_rescheduling(tmp_path):
+    clock = FakeClock()
+    game = headless_game(tmp_path, clock)
+    game.speed_var.get.return_value = True
+    game.toggle_speed_mode()
+    assert scheduled(game) == [(1000, game.update_timer)]
+
+    clock.now += 20
+    game.on_entry_change(None)
+    assert game.speed_timer.remaining() == 30
+    assert len(scheduled(game)) == 1
+    assert not game.root.after_cancel.called
+
+
+def test_speed_mode_expiry_submits_the_entry(tmp_path):
+    clock = FakeClock()
+    game = headless_game(tmp_path, clock)
+    game.speed_var.get.return_value = True
+    game.toggle_speed_mode()
+    game.entry.get.return_value = game.target_number
+    clock.now += 30
+    game.update_timer()
+    assert game.game_won
+    assert len(game.guess_history) == 1
+    assert not game.timer_running
+
+
+def test_speed_mode_expiry_with_an_invalid_entry_starts_over(tmp_path):
+    clock = FakeClock()
+    game = headless_game(tmp_path, clock)
+    game.speed_var.get.return_value = True
+    game.toggle_speed_mode()
+    game.entry.get.return_value = ""
+    clock.now += 30.05
+    game.update_timer()
+    assert not game.guess_history
+    assert game.speed_timer.remaining() == 30
+    assert game.speed_timer.drift_stats()['wakeups'] == 1
+    assert scheduled(game)[-1] == (1000, game.update_timer)
+
+
+def test_speed_mode_pause_and_resume(tmp_path):
+    clock = FakeClock()
+    game = headless_game(tmp_path, clock)
+    game.speed_var.get.return_value = True
+    game.toggle_speed_mode()
+    clock.now += 12
+
+    game.speed_var.get.return_value = False
+    game.toggle_speed_mode()
+    assert not game.timer_running
+    game.root.after_cancel.assert_called_once()
+    # A wakeup that was already on its way does nothing once stopped
+    game.update_timer()
+    assert len(scheduled(game)) == 1
+
+    clock.now += 100
+    game.speed_var.get.return_value = True
+    game.toggle_speed_mode()
+    assert game.timer_running
+    assert game.speed_timer.remaining() == 30
+    assert len(scheduled(game)) == 2
+
+
+def test_new_game_restarts_the_speed_timer(tmp_path):
+    clock = FakeClock()
+    game = headless_game(tmp_path, clock)
+    game.speed_var.get.return_value = True
+    game.toggle_speed_mode()
+    clock.now += 25
+    game.reset_game()
+    assert game.timer_running
+    assert game.speed_timer.remaining() == 30
+    assert game.root.after_cancel.call_count == 1
+    assert scheduled(game)[-1] == (1000, game.update_timer)
+
+
+def test_history_lines_are_rendered_once_and_appended(tmp_path):
+    game = headless_game(tmp_path)
+    game.engine.new_game("1234")
+    with mock.patch.object(numble, 'format_feedback', wraps=numble.format_feedback) as render:
+        for guess in ("5678", "1243", "4321"):
+            game.entry.get.return_value = guess
+            game.check_guess()
+            # Only the new guess is rendered and inserted
+            game.history_text.insert.assert_called_with('end', game.rendered_history_lines()[-1])
+        assert render.call_count == 3
+        lines = game.rendered_history_lines()
+        assert lines is game.history_lines["standard"]
+        assert lines[1] == "2. 1243  →  🔒🔒🔓🔓\n"
+
+        # A new display mode renders each entry once; switching back reuses the cache
+        game.show_symbol_positions = True
+        game.update_history_display()
+        assert render.call_count == 6
+        assert game.history_lines["positions"][1] == "2. 1243  →  🔒 🔒 🔓 🔓\n"
+        game.show_symbol_positions = False
+        game.update_history_display()
+        game.show_symbol_positions = True
+        game.update_history_display()
+        assert render.call_count == 6
+
+        game.entry.get.return_value = "1234"
+        game.check_guess()
+        assert render.call_count == 7
+        assert len(game.history_lines["standard"]) == 3  # other modes catch up when shown
@@ -0,0 +1,54 @@
+import json
+
+from numble_engine import NumbleEngine
+from numble_replay import (
+    decode_replay, encode_replay, read_replays, record_replay, replay_from_record, verify_replay
+)
+from numble_stats import game_record
+
+
+def played_game(seed=42, settings=(5, True, "standard")):
+    engine = NumbleEngine(*settings)
+    engine.new_game(seed=seed)
+    for guess in ("12345", "67890", "01234"):
+        engine.submit_guess(guess[:engine.digit_count])
+    engine.submit_guess(engine.target_number)
+    return engine
+
+
+def test_replay_round_trip_verifies():
+    replay = record_replay(played_game())
+    decoded = decode_replay(encode_replay(replay))
+    assert decoded.seed == replay.seed
+    assert [guess[:2] for guess in decoded.guesses] == [guess[:2] for guess in replay.guesses]
+    assert verify_replay(decoded) is None
+
+
+def test_divergence_is_reported():
+    replay = record_replay(played_game())
+    guess, code, elapsed = replay.guesses[0]
+    tampered = replay._replace(guesses=((guess, code ^ 1, elapsed),) + replay.guesses[1:])
+    assert "guess 1" in verify_replay(tampered)
+    assert verify_replay(replay._replace(seed=replay.seed + 1)) is not None
+
+
+def test_stats_log_records_replay(tmp_path):
+    path = tmp_path / "games.jsonl"
+    engine = played_game(7, (4, False, "hard"))
+    path.write_text(json.dumps(game_record(engine, 'won')) + "\n" + encode_replay(record_replay(played_game())) + "\n")
+    replays = list(read_replays(str(path)))
+    assert len(replays) == 2
+    assert all(verify_replay(replay) is None for replay in replays)
+
+
+def test_record_keeps_settings_changed_mid_game():
+    # The Tk front end changes the digit count, then records the game it abandons
+    engine = NumbleEngine(4, False, "standard")
+    engine.new_game(seed=3)
+    engine.submit_guess("1234")
+    engine.digit_count = 5
+    engine.allow_repeating_digits = True
+    record = game_record(engine, 'abandoned')
+    assert (record['digit_count'], record['allow_repeating_digits']) == (4, False)
+    assert verify_replay(replay_from_record(record)) is None
+    assert verify_replay(record_replay(engine)) is None
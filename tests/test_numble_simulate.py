@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+import numble_simulate
+import numble_table
+from numble_engine import np
+from numble_simulate import load_checkpoint, plan_tasks, run_chunk, run_key
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+def test_chunk_results_do_not_depend_on_worker_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(numble_table, 'DEFAULT_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(numble_table, '_tables', {})
+    numble_simulate._init_worker(numble_simulate.DEFAULT_STRATEGY, 30, 5)
+    tasks = plan_tasks([(3, True, "standard")], 192, 5)
+    alone = run_chunk(tasks[2])
+    assert numble_table.get_table(3, True).ready  # scored through the stored table
+    for task in tasks:
+        run_chunk(task)
+    assert run_chunk(tasks[2]) == alone
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+def test_chunk_results_match_without_the_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(numble_table, 'DEFAULT_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(numble_table, '_tables', {})
+    numble_simulate._init_worker(numble_simulate.DEFAULT_STRATEGY, 30, 5)
+    task = plan_tasks([(3, False, "hard")], 64, 5)[0]
+    tabled = run_chunk(task)
+    monkeypatch.setattr(numble_simulate, 'load_table', lambda *settings: False)
+    monkeypatch.setattr(numble_table.FeedbackTable, 'ready', False)
+    assert run_chunk(task) == tabled
+
+
+def test_checkpoint_ignores_other_runs(tmp_path):
+    path = tmp_path / "sim.jsonl"
+    run = run_key("numble_simulate:solver_strategy", 1000, 0, 30)
+    other = run_key("numble_simulate:solver_strategy", 500, 0, 30)
+    records = [
+        {'run': run, 'config': '4/unique/hard', 'chunk': 0, 'histogram': {'6': 3}},
+        {'run': other, 'config': '4/unique/hard', 'chunk': 1, 'histogram': {'7': 9}},
+        {'config': '4/unique/hard', 'chunk': 2, 'histogram': {'8': 1}},  # untagged, from older versions
+    ]
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records) + '{"run": "tor')
+    done, histograms, foreign = load_checkpoint(str(path), run)
+    assert done == {('4/unique/hard', 0)}
+    assert histograms == {'4/unique/hard': {'6': 3}}
+    assert foreign == 2
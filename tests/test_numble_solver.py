@@ -0,0 +1,91 @@
+import pytest
+
+from numble_engine import NumbleEngine, np, score_guess
+
+pytestmark = pytest.mark.skipif(np is None, reason="numpy not installed")
+
+
+@pytest.mark.parametrize('mode', ["easy", "standard", "hard"])
+def test_guesses_narrow_to_consistent_candidates(mode):
+    from numble_solver import NumbleSolver
+    engine = NumbleEngine(4, True, mode)
+    engine.new_game(seed=11)
+    solver = NumbleSolver(4, True, mode, seed=0)
+    results = []
+    for guess in ("1234", "5678", "9012"):
+        results.append(engine.submit_guess(guess))
+        solver.add_guess(guess, results[-1]['code'])
+
+    # Exactly the numbers that would have shown the same feedback
+    probe = NumbleEngine(4, True, mode)
+    expected = []
+    for number in solver.numbers:
+        probe.new_game(number)
+        if all(probe.calculate_feedback(result['guess'])['feedback'] == result['feedback']
+               for result in results):
+            expected.append(number)
+    assert solver.candidate_numbers() == expected
+    assert engine.target_number in expected
+
+
+def test_sync_matches_guess_by_guess_pruning():
+    from numble_solver import NumbleSolver
+    engine = NumbleEngine(5, False, "standard")
+    engine.new_game(seed=3)
+    incremental = NumbleSolver(5, False, "standard", seed=0)
+    for guess in ("01234", "56789"):
+        incremental.add_guess(guess, engine.submit_guess(guess)['code'])
+
+    caught_up = NumbleSolver(5, False, "standard", seed=0)
+    caught_up.sync(engine)
+    assert caught_up.candidates.tolist() == incremental.candidates.tolist()
+    incremental.sync(engine)  # already up to date: nothing to redo
+    assert incremental.guesses == caught_up.guesses
+
+    engine.new_game(seed=4)
+    caught_up.sync(engine)
+    assert caught_up.remaining == len(caught_up.numbers)
+
+
+def test_suggestion_solves():
+    from numble_solver import NumbleSolver
+    engine = NumbleEngine(4, False, "standard")
+    engine.new_game(seed=8)
+    solver = NumbleSolver(4, False, "standard", seed=0)
+    while not engine.game_over and len(engine.guess_history) < 12:
+        guess = solver.suggest()
+        solver.add_guess(guess, engine.submit_guess(guess)['code'])
+    assert engine.game_won
+
+
+@pytest.mark.parametrize('mode,show_positions', [("easy", False), ("standard", False),
+                                                 ("standard", True), ("hard", False)])
+def test_table_backed_solver_matches_direct_scoring(tmp_path, monkeypatch, mode, show_positions):
+    import numble_table
+    from numble_solver import NumbleSolver
+    monkeypatch.setattr(numble_table, 'DEFAULT_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(numble_table, '_tables', {})
+    numble_table.get_table(3, False).load()
+
+    direct = NumbleSolver(3, False, mode, show_positions, seed=0)
+    tabled = NumbleSolver(3, False, mode, show_positions, seed=0, use_feedback_table=True)
+    assert tabled._table_codes() is not None
+    engine = NumbleEngine(3, False, mode, use_feedback_table=True)
+    for seed in range(5):
+        engine.new_game(seed=seed)
+        while not engine.game_over:
+            direct.sync(engine, show_positions)
+            tabled.sync(engine, show_positions)
+            assert tabled.candidates.tolist() == direct.candidates.tolist()
+            guess = tabled.suggest()
+            assert guess == direct.suggest()
+            engine.submit_code(guess)
+        assert engine.game_won
+
+
+def test_unstored_space_scores_directly():
+    from numble_solver import NumbleSolver
+    solver = NumbleSolver(5, True, "standard", seed=0, use_feedback_table=True)
+    assert solver.table is None
+    solver.add_guess("12345", score_guess("12345", "54321"))
+    assert "54321" in solver.candidate_numbers()
@@ -0,0 +1,65 @@
+import json
+import os
+
+from numble_engine import NumbleEngine
+from numble_stats import SNAPSHOT_INTERVAL, StatsStore, game_record
+
+
+def play(engine, guesses, target="1234"):
+    engine.new_game(target)
+    for guess in guesses:
+        engine.submit_guess(guess)
+    return game_record(engine, 'won' if engine.game_won else 'abandoned')
+
+
+def test_reload_matches_recorded(tmp_path):
+    store = StatsStore(str(tmp_path))
+    store.load()
+    engine = NumbleEngine()
+    for n in range(SNAPSHOT_INTERVAL + 3):
+        store.record_game(play(engine, ["5678"] * (n % 3) + ["1234"]))
+    store.record_game(play(engine, ["5678"]))
+
+    reloaded = StatsStore(str(tmp_path))
+    reloaded.load()
+    assert reloaded.stats == store.stats
+    assert reloaded.by_settings == store.by_settings
+    assert reloaded.stats['games_played'] == SNAPSHOT_INTERVAL + 4
+    assert reloaded.stats['current_streak'] == 0
+    assert reloaded.unsnapshotted == 4  # only the games after the snapshot were replayed
+
+
+def test_torn_record_is_dropped(tmp_path):
+    store = StatsStore(str(tmp_path))
+    store.load()
+    engine = NumbleEngine()
+    store.record_game(play(engine, ["1234"]))
+    store.record_game(play(engine, ["5678", "1234"]))
+    with open(store.log_path, 'ab') as log:
+        log.write(b'{"outcome": "won", "gues')  # crash mid-write
+
+    reloaded = StatsStore(str(tmp_path))
+    reloaded.load()
+    assert reloaded.stats['games_won'] == 2
+    assert reloaded.stats['best_score'] == 1
+    assert os.path.getsize(store.log_path) == reloaded.log_offset
+
+    # The next game appends cleanly after the truncated tail
+    reloaded.record_game(play(engine, ["1234"]))
+    assert [record['outcome'] for record in reloaded.games()] == ['won'] * 3
+
+
+def test_stale_snapshot_catches_up_from_log(tmp_path):
+    store = StatsStore(str(tmp_path))
+    store.load()
+    engine = NumbleEngine()
+    store.record_game(play(engine, ["1234"]))
+    store.snapshot()
+    store.record_game(play(engine, ["5678", "1234"]))
+
+    with open(store.snapshot_path) as f:
+        assert json.load(f)['stats']['games_played'] == 1
+    reloaded = StatsStore(str(tmp_path))
+    reloaded.load()
+    assert reloaded.stats['games_played'] == 2
+    assert reloaded.stats['guess_distribution'] == {'1': 1, '2': 1}
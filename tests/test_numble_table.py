@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from numble_engine import all_numbers, score_guess
+from numble_table import FeedbackTable
+
+
+@pytest.mark.parametrize('digit_count,repeats', [(3, False), (3, True)])
+def test_stored_rows_match_score_guess(tmp_path, digit_count, repeats):
+    table = FeedbackTable(digit_count, repeats, cache_dir=str(tmp_path))
+    assert table.stored
+    numbers = all_numbers(digit_count, repeats)
+    rng = random.Random(0)
+    for guess_index in rng.sample(range(len(numbers)), 20):
+        assert list(table.row(guess_index)) == [score_guess(numbers[guess_index], target) for target in numbers]
+    guess, target = numbers[5], numbers[-3]
+    assert table.score(guess, target) == score_guess(guess, target)
+    table.close()
+
+    # A second table maps the cached file instead of rebuilding it
+    reopened = FeedbackTable(digit_count, repeats, cache_dir=str(tmp_path))
+    assert reopened._open()
+    assert reopened.lookup(table.index(guess), table.index(target)) == score_guess(guess, target)
+    reopened.close()
+
+
+def test_unstored_rows_are_computed(tmp_path):
+    table = FeedbackTable(5, True, cache_dir=str(tmp_path))
+    assert not table.stored
+    numbers = table.numbers
+    row = table.row(12345)
+    for target_index in random.Random(1).sample(range(len(numbers)), 200):
+        assert row[target_index] == score_guess("12345", numbers[target_index])
+    assert table.score("12345", "54321") == score_guess("12345", "54321")
+
+
+def test_rows_outlive_close(tmp_path):
+    table = FeedbackTable(3, False, cache_dir=str(tmp_path))
+    row = table.row(0)
+    table.close()
+    assert row[0] == score_guess(table.numbers[0], table.numbers[0])
+
+
+def test_score_builds_in_background(tmp_path):
+    table = FeedbackTable(3, True, cache_dir=str(tmp_path))
+    assert table.score("123", "321") == score_guess("123", "321")  # before the table is ready
+    table._loader.join()
+    assert table._codes is not None
+    assert table.score("123", "321") == score_guess("123", "321")
+    table.close()
+
+
+def test_matrix_matches_rows_and_outlives_close(tmp_path):
+    np = pytest.importorskip("numpy")
+    table = FeedbackTable(3, False, cache_dir=str(tmp_path))
+    assert not table.ready
+    matrix = table.matrix()
+    assert table.ready
+    assert matrix.shape == (table.size, table.size)
+    assert matrix[7].tolist() == list(table.row(7))
+    table.close()
+    assert np.array_equal(matrix[-1], [score_guess(table.numbers[-1], target) for target in table.numbers])
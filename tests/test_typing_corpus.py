@@ -0,0 +1,94 @@
+import os
+import random
+
+from typing_corpus import Corpus, DifficultyIndex, DifficultyScorer
+
+
+def write_corpus(path, lines):
+    path.write_bytes(b''.join(lines))
+    return str(path)
+
+
+def test_index_offsets_skip_lines_without_text(tmp_path):
+    path = write_corpus(tmp_path / "corpus.txt", [
+        b"first passage\n",
+        b"\n",
+        b"   \t\n",
+        b"\xff\xfe\n",                       # only invalid UTF-8
+        "　 \n".encode(),            # only non-ASCII whitespace
+        b"second passage\r\n",
+        b"  third  ",                         # no trailing newline
+    ])
+    corpus = Corpus(path)
+    assert list(corpus.passages()) == ["first passage", "second passage", "third"]
+    with open(path, 'rb') as f:
+        data = f.read()
+    offsets = list(corpus.offsets)
+    assert [data[start:end] for start, end in zip(offsets[::2], offsets[1::2])] == \
+        [b"first passage", b"second passage", b"  third  "]
+    corpus.close()
+
+
+def test_index_is_cached_and_rebuilt_when_the_corpus_changes(tmp_path):
+    path = write_corpus(tmp_path / "corpus.txt", [b"one\n", b"two\n"])
+    Corpus(path).close()
+    assert os.path.exists(path + ".idx")
+    corpus = Corpus(path)
+    assert corpus._index is not None  # mapped from the cache
+    assert len(corpus) == 2
+    corpus.close()
+
+    write_corpus(tmp_path / "corpus.txt", [b"one\n", b"two\n", b"three\n"])
+    corpus = Corpus(path)
+    assert list(corpus.passages()) == ["one", "two", "three"]
+    corpus.close()
+
+
+def test_scorer_handles_an_empty_passage():
+    assert DifficultyScorer({'a': 1}).score("") == 0.0
+
+
+def make_difficulty_corpus(tmp_path):
+    rng = random.Random(5)
+    lines = []
+    for i in range(300):
+        words = [''.join(rng.choice('etaoinsrhl') for _ in range(rng.randint(2, 8)))
+                 for _ in range(rng.randint(2, 30))]
+        if i % 10 == 0:
+            words.append("zq;x!")
+        lines.append((' '.join(words) + "\n").encode())
+    lines.insert(7, b"\xff\n")  # ignored, as above
+    return Corpus(write_corpus(tmp_path / "corpus.txt", lines))
+
+
+def test_difficulty_index_orders_and_reopens(tmp_path):
+    corpus = make_difficulty_corpus(tmp_path)
+    index = DifficultyIndex(corpus)
+    scores = list(index.scores)
+    order = list(index.order)
+    assert sorted(order) == list(range(len(corpus)))
+    assert [scores[i] for i in order] == sorted(scores)
+    index.close()
+
+    reopened = DifficultyIndex(corpus)
+    assert reopened._mapping is not None  # read from the sidecar
+    assert list(reopened.order) == order
+    reopened.close()
+    corpus.close()
+
+
+def test_difficulty_index_samples(tmp_path):
+    corpus = make_difficulty_corpus(tmp_path)
+    index = DifficultyIndex(corpus)
+    rng = random.Random(1)
+    rank = {i: r for r, i in enumerate(index.order)}
+    count = len(corpus)
+    for _ in range(200):
+        i = index.sample_band(1 / 3, 2 / 3, rng)
+        assert count // 3 <= rank[i] < -(-2 * count // 3)
+    for _ in range(50):
+        assert 'z' in corpus.passage(index.sample_weak_keys({'Z': 1.0}, rng))
+    assert index.sample_weak_keys({'€': 1.0}, rng) is None
+    assert index.sample_weak_keys({}, rng) is None
+    index.close()
+    corpus.close()
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from typing_engine import (
+    CORRECT, DELETED, MIN_ELAPSED_NS, TYPED, WRONG, SlidingWindow, TypingAnalytics, TypingTracker, keystrokes
+)
+
+SECOND = 1_000_000_000
+
+
+def brute_correct(sample, typed):
+    return sum(1 for i, char in enumerate(typed) if i < len(sample) and char == sample[i])
+
+
+def test_edits_at_the_end_match_full_rescore():
+    rng = random.Random(1)
+    for _ in range(300):
+        sample = ''.join(rng.choice('ab c') for _ in range(rng.randint(0, 30)))
+        tracker = TypingTracker(sample)
+        typed = ''
+        for _ in range(40):
+            if rng.random() < 0.7:
+                char = rng.choice('ab c')
+                span = tracker.replace(len(typed), len(typed), char)
+                assert span == (len(typed), len(typed), len(typed) + 1)
+                typed += char
+            elif typed:
+                span = tracker.replace(len(typed) - 1, len(typed), '')
+                assert span == (len(typed) - 1, len(typed), len(typed) - 1)
+                typed = typed[:-1]
+            assert tracker.correct == brute_correct(sample, typed)
+            assert tracker.complete == (typed == sample)
+
+
+def test_replace_matches_full_rescore():
+    rng = random.Random(2)
+    for _ in range(300):
+        sample = ''.join(rng.choice('ab c') for _ in range(rng.randint(0, 30)))
+        tracker = TypingTracker(sample)
+        typed = ''
+        for _ in range(40):
+            start = rng.randint(0, len(typed))
+            end = rng.randint(start, len(typed))
+            text = ''.join(rng.choice('ab c') for _ in range(rng.randint(0, 3)))
+            assert tracker.replace(start, end, text) == (start, len(typed), len(typed) - (end - start) + len(text))
+            typed = typed[:start] + text + typed[end:]
+            assert tracker.typed == typed
+            assert tracker.correct == brute_correct(sample, typed)
+
+
+def test_keystrokes_for_an_edit():
+    events = list(keystrokes("abcd", 1, "xy", "bz"))
+    assert events == [(DELETED, 2, 'y', False), (DELETED, 1, 'x', False),
+                      (TYPED, 1, 'b', True), (TYPED, 2, 'z', False)]
+
+
+def test_runs_cover_changed_span():
+    tracker = TypingTracker("hello world")
+    tracker.replace(0, 0, "helo")
+    assert list(tracker.runs(0, 4)) == [(CORRECT, 0, 3), (WRONG, 3, 4)]
+    assert tracker.cursor == 4
+    assert tracker.accuracy == 75
+
+
+def test_weak_keys_count_forward_typing_only():
+    tracker = TypingTracker("abc")
+    tracker.replace(0, 0, "a")
+    tracker.replace(1, 1, "x")
+    tracker.replace(1, 2, "")   # deleting is not an attempt
+    tracker.replace(1, 1, "b")
+    tracker.replace(2, 2, "c")
+    assert tracker.key_attempts == {'a': 1, 'b': 2, 'c': 1}
+    assert tracker.weak_keys() == {'b': 0.5}
+
+
+def test_sliding_window_expires_old_keystrokes():
+    window = SlidingWindow(5)
+    for t in range(10):
+        window.add(t * SECOND, t % 2 == 0)
+    window.expire(9 * SECOND)
+    assert [timestamp for timestamp, _ in window.events] == [t * SECOND for t in range(5, 10)]
+    assert (window.typed, window.correct) == (5, 2)
+
+
+def test_window_stats():
+    analytics = TypingAnalytics(windows=(5, 60))
+    start = 10 * SECOND
+    # 12 s of typing, a keystroke every 200 ms; every fifth one wrong
+    for i in range(60):
+        analytics.keystroke(start + i * SECOND // 5, TYPED, i % 5 != 4)
+        analytics.keystroke(start + i * SECOND // 5, DELETED, False)  # not counted
+    now = start + 12 * SECOND
+    stats = analytics.stats(now)
+    # The minute window covers the 12 s so far: 60 characters is 12 words
+    assert stats[60].raw_wpm == pytest.approx(60)
+    assert stats[60].net_wpm == pytest.approx(48)
+    assert stats[60].error_rate == pytest.approx(0.2)
+    # The 5 s window holds only the last 24 keystrokes, just as fast
+    assert stats[5].raw_wpm == pytest.approx(24 / 5 / (5 / 60))
+    # Burst is the best 5 s up to a keystroke: 25 of them, 20 correct
+    assert analytics.burst == pytest.approx(20 / 5 / (5 / 60))
+
+
+def test_stats_before_and_at_the_start():
+    analytics = TypingAnalytics()
+    assert all(stat.raw_wpm == 0 for stat in analytics.stats(SECOND).values())
+    analytics.keystroke(SECOND, TYPED, True)
+    # One keystroke does not read as thousands of WPM
+    assert analytics.stats(SECOND)[60].raw_wpm == pytest.approx(1 / 5 / (MIN_ELAPSED_NS / 60e9))
+    assert analytics.burst == 0
+
+
+def test_pastes_are_left_out_of_the_speed_figures():
+    analytics = TypingAnalytics()
+    analytics.edit(SECOND, list(keystrokes("hello world", 0, "", "hello")))
+    assert analytics.started is None
+    analytics.edit(SECOND, list(keystrokes("hello world", 0, "", "h")))
+    analytics.edit(2 * SECOND, list(keystrokes("hello world", 1, "", "x")))
+    analytics.edit(2 * SECOND, list(keystrokes("hello world", 1, "x", "")))
+    window = analytics.windows[60]
+    assert (window.typed, window.correct) == (2, 1)
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+from typing_engine import DELETED, TYPED
+from typing_keylog import PASSAGE, KeyLog, keystroke_intervals, read_session
+
+
+def held_writer(log):
+    """Stop the log's writer from draining until the returned event is set"""
+    release = threading.Event()
+    drain = log._drain
+
+    def held_drain():
+        release.wait()
+        drain()
+    log._drain = held_drain
+    return release
+
+
+def test_nothing_is_written_until_something_is_typed(tmp_path):
+    log = KeyLog(str(tmp_path), flush_interval=0.01)
+    log.passage(time.perf_counter_ns(), "a passage")
+    log.passage(time.perf_counter_ns(), "another")
+    time.sleep(0.05)
+    log.close()
+    assert not os.listdir(tmp_path)
+
+
+def test_close_writes_everything_back(tmp_path):
+    log = KeyLog(str(tmp_path), flush_interval=3600)
+    log.passage(100, "abc")
+    log.keystroke(200, TYPED, 0, 'a', True)
+    log.keystroke(300, TYPED, 1, 'x', False)
+    log.keystroke(400, DELETED, 1, 'x', False)
+    log.close()
+    session = read_session(log.path)
+    assert [tuple(event) for event in session.events] == [
+        (100, 3, '\0', PASSAGE, False),
+        (200, 0, 'a', TYPED, True),
+        (300, 1, 'x', TYPED, False),
+        (400, 1, 'x', DELETED, False),
+    ]
+    assert list(keystroke_intervals(session.events)) == []
+
+
+def test_ring_buffer_wraps_around(tmp_path):
+    log = KeyLog(str(tmp_path), capacity=8, flush_interval=3600)
+    release = held_writer(log)
+    for i in range(6):
+        log.keystroke(i, TYPED, i, 'a', True)
+    release.set()  # half full, so the writer was woken
+    deadline = time.monotonic() + 5
+    while log.tail != log.head and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert log.tail == 6
+    for i in range(6, 13):  # these wrap past the end of the buffer
+        log.keystroke(i, TYPED, i, 'b', True)
+    log.close()
+    events = read_session(log.path).events
+    assert [event.time for event in events] == list(range(13))
+    assert [event.char for event in events] == ['a'] * 6 + ['b'] * 7
+    assert log.dropped == 0
+
+
+def test_events_are_dropped_and_counted_when_the_writer_falls_behind(tmp_path):
+    log = KeyLog(str(tmp_path), capacity=8, flush_interval=3600)
+    release = held_writer(log)
+    for i in range(11):
+        log.keystroke(i, TYPED, i, 'a', True)
+    assert log.dropped == 3
+    release.set()
+    log.close()
+    assert [event.time for event in read_session(log.path).events] == list(range(8))
@@ -0,0 +1,73 @@
+import time
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from typing_engine import TypingAnalytics, TypingTracker
+from typing_trainer import STATS_MS, TypingTest
+
+
+class FakeRoot:
+    """Records after() calls instead of running a Tk event loop"""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func):
+        self.scheduled.append((ms, func))
+        return f"after#{len(self.scheduled)}"
+
+    def after_cancel(self, job):
+        pass
+
+
+def headless_trainer(sample):
+    app = object.__new__(TypingTest)
+    app.root = FakeRoot()
+    app.sample_text = sample
+    app.tracker = TypingTracker(sample)
+    app.analytics = TypingAnalytics()
+    app.keylog = None
+    app.label_text = {}
+    app.time_left = 60
+    app.start_time = None
+    app.timer_running = False
+    app.stats_job = None
+    for widget in ('entry', 'sample_display', 'time_label', 'wpm_label', 'accuracy_label', 'detail_label'):
+        setattr(app, widget, mock.MagicMock())
+    app.renders = 0
+    render_stats = app.render_stats
+
+    def counted_render():
+        app.renders += 1
+        render_stats()
+    app.render_stats = counted_render
+    return app
+
+
+def test_stats_are_redrawn_on_a_timer_not_per_keystroke():
+    app = headless_trainer("the quick brown fox")
+    for i, char in enumerate("the quick"):
+        app.on_edit(time.perf_counter_ns(), i, i, char)
+    assert app.renders == 0
+    refreshes = [ms for ms, func in app.root.scheduled if func == app.refresh_stats]
+    assert refreshes == [STATS_MS]
+
+    app.refresh_stats()
+    assert app.renders == 1
+    assert app.root.scheduled[-1] == (STATS_MS, app.refresh_stats)
+    assert app.stats_job is not None
+
+    app.timer_running = False
+    app.refresh_stats()
+    assert app.renders == 2
+    assert app.stats_job is None
+
+
+def test_labels_are_only_reconfigured_when_their_text_changes():
+    app = headless_trainer("abc")
+    app.set_label(app.wpm_label, "WPM: 40")
+    app.set_label(app.wpm_label, "WPM: 40")
+    app.set_label(app.wpm_label, "WPM: 41")
+    assert app.wpm_label.config.call_count == 2
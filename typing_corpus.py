@@ -0,0 +1,309 @@
+"""Indexed, memory-mapped passage corpus for the typing test.
+
+A corpus is a text file with one passage per line. The first time a
+corpus is opened, one pass over it records where each non-blank line
+starts and ends; the offsets are cached next to the file as
+`<name>.idx` and rebuilt whenever the file's size or modification time
+changes. After that, opening a corpus maps the text and its index
+without reading either, and picking a random passage touches one pair
+of offsets and one line, so neither startup nor selection depends on
+the corpus size.
+
+The index is a 32-byte header (magic, source size, source mtime in
+ns, passage count) followed by a start and end offset per passage,
+8 bytes each in native byte order. It is a cache and is simply
+rebuilt if it doesn't match.
+
+`DifficultyIndex` is a second, optional cache (`<name>.difficulty`),
+built the first time it is opened: every passage scored once for
+length, character rarity, bigram difficulty and punctuation density,
+the passage ids in score order, and for each key the passages where it
+is densest. A difficulty band or a weak-key profile then picks a
+passage in O(1). Building takes a pass over the corpus, so the trainer
+opens it on a worker thread.
+"""
+import heapq
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from collections import Counter
+
+INDEX_SUFFIX = '.idx'
+MAGIC = b'TYPIDX2' + (b'<' if sys.byteorder == 'little' else b'>')
+HEADER = struct.Struct('=8sQqQ')  # magic, source size, source mtime ns, passage count
+
+DIFFICULTY_SUFFIX = '.difficulty'
+DIFFICULTY_MAGIC = b'TYPDIF1' + MAGIC[-1:]
+DIFFICULTY_HEADER = struct.Struct('=8sQqQQQ')  # + key count, posting count
+
+# Relative weight of each difficulty feature in a passage's score
+LENGTH_WEIGHT = 0.6       # per doubling of the length
+RARITY_WEIGHT = 1.0       # per bit of mean character surprisal
+BIGRAM_WEIGHT = 2.0       # per unit of mean bigram cost
+PUNCTUATION_WEIGHT = 8.0  # per unit of punctuation density
+
+# Passages kept per key for weak-key practice, densest first
+PASSAGES_PER_KEY = 256
+
+# Finger of each key on a QWERTY keyboard, row by row: 0-3 are the
+# left hand pinky to index, 4-7 the right hand index to pinky
+KEYBOARD_ROWS = (
+    ('`1234567890-=', '0012334456777'),
+    ('qwertyuiop[]\\', '0123344567777'),
+    ("asdfghjkl;'", '01233445677'),
+    ('zxcvbnm,./', '0123344567'),
+)
+KEY_POSITIONS = {key: (int(finger), row)
+                 for row, (keys, fingers) in enumerate(KEYBOARD_ROWS)
+                 for key, finger in zip(keys, fingers)}
+SHIFTED = dict(zip('~!@#$%^&*()_+{}|:"<>?', "`1234567890-=[]\\;',./"))
+
+
+def passage_text(data):
+    """A passage's text from its bytes in the corpus"""
+    return data.decode('utf-8', errors='ignore').strip()
+
+
+def build_offsets(path):
+    """Start and end offsets of every line with text, newline excluded"""
+    offsets = array('Q')
+    position = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            text = line.rstrip(b'\r\n')
+            if passage_text(text):
+                offsets.append(position)
+                offsets.append(position + len(text))
+            position += len(line)
+    return offsets
+
+
+def key_position(char):
+    """(finger, row) of the key typing char, or None if it isn't on the keyboard"""
+    return KEY_POSITIONS.get(SHIFTED.get(char, char.lower()))
+
+
+def bigram_cost(a, b):
+    """How awkward it is to type b straight after a"""
+    first, second = key_position(a), key_position(b)
+    if a == ' ' or b == ' ':
+        return 0.1  # thumbs
+    if first is None or second is None:
+        return 0.5
+    if a.lower() == b.lower():
+        return 0.1
+    (finger_a, row_a), (finger_b, row_b) = first, second
+    rows = abs(row_a - row_b)
+    if finger_a == finger_b:
+        return 1.0 + 0.25 * rows
+    if (finger_a < 4) == (finger_b < 4):
+        return 0.4 + 0.15 * rows
+    return 0.1
+
+
+class BigramCosts(dict):
+    """bigram_cost of two-character strings, computed on first use"""
+    def __missing__(self, pair):
+        cost = self[pair] = bigram_cost(*pair)
+        return cost
+
+
+class DifficultyScorer:
+    """Scores passages against a corpus's character frequencies"""
+    def __init__(self, char_counts):
+        total = sum(char_counts.values())
+        self.surprisal = {char: -math.log2(n / total) for char, n in char_counts.items()}
+        self.bigram_costs = BigramCosts()
+
+    def score(self, text, counts=None):
+        """Difficulty of a passage; counts is Counter(text), if already made"""
+        counts = counts or Counter(text)
+        length = len(text)
+        if not length:
+            return 0.0
+        rarity = punctuation = 0.0
+        for char, n in counts.items():
+            rarity += n * self.surprisal[char]
+            if not char.isalnum() and not char.isspace():
+                punctuation += n
+        bigrams = sum(map(self.bigram_costs.__getitem__, map(str.__add__, text, text[1:])))
+        return (LENGTH_WEIGHT * math.log2(length) + RARITY_WEIGHT * rarity / length
+                + BIGRAM_WEIGHT * bigrams / max(length - 1, 1) + PUNCTUATION_WEIGHT * punctuation / length)
+
+
+class Corpus:
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        stat = os.stat(path)
+        self._text = self._index = None
+        self.offsets = self._open_index(stat)
+        if self.offsets is None:
+            self.offsets = self._build_index(stat)
+        self.count = len(self.offsets) // 2
+        if not self.count:
+            raise ValueError(f"No passages in {path}")
+        with open(path, 'rb') as f:
+            self._text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _open_index(self, stat):
+        """Offsets from a cached index that matches the source, or None"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # missing, unreadable or empty
+            return None
+        if len(index) >= HEADER.size:
+            magic, size, mtime_ns, count = HEADER.unpack_from(index)
+            if (magic, size, mtime_ns) == (MAGIC, stat.st_size, stat.st_mtime_ns) \
+                    and len(index) == HEADER.size + count * 16:
+                self._index = index
+                return memoryview(index)[HEADER.size:].cast('Q')
+        index.close()
+        return None
+
+    def _build_index(self, stat):
+        offsets = build_offsets(self.path)
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets) // 2))
+                offsets.tofile(f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            # A read-only corpus still works, indexed afresh each time
+            print(f"Could not cache corpus index: {e}")
+        return offsets
+
+    def __len__(self):
+        return self.count
+
+    def passage(self, i):
+        start, end = self.offsets[2 * i], self.offsets[2 * i + 1]
+        return passage_text(self._text[start:end])
+
+    def random_passage(self, rng=random):
+        return self.passage(rng.randrange(self.count))
+
+    def passages(self):
+        for i in range(self.count):
+            yield self.passage(i)
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        for mapping in (self._index, self._text):
+            if mapping is not None:
+                mapping.close()
+
+
+class DifficultyIndex:
+    """Passages of a Corpus by difficulty and by key, scored once and cached"""
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.path = corpus.path + DIFFICULTY_SUFFIX
+        self._mapping = None
+        stat = os.stat(corpus.path)
+        if not self._open(stat):
+            self._build(stat)
+
+    def _open(self, stat):
+        try:
+            with open(self.path, 'rb') as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        if len(mapping) >= DIFFICULTY_HEADER.size:
+            magic, size, mtime_ns, count, key_count, posting_count = DIFFICULTY_HEADER.unpack_from(mapping)
+            expected = DIFFICULTY_HEADER.size + 4 * (2 * count + 2 * key_count + 1 + posting_count)
+            if (magic, size, mtime_ns, count) == (DIFFICULTY_MAGIC, stat.st_size, stat.st_mtime_ns,
+                                                  self.corpus.count) and len(mapping) == expected:
+                self._mapping = mapping
+                self._load(memoryview(mapping), count, key_count, posting_count)
+                return True
+        mapping.close()
+        return False
+
+    def _load(self, data, count, key_count, posting_count):
+        """Slice the arrays out of a buffer laid out as _build writes them"""
+        offset = DIFFICULTY_HEADER.size
+        arrays = []
+        for code, length in (('f', count), ('I', count), ('I', key_count),
+                             ('I', key_count + 1), ('I', posting_count)):
+            arrays.append(data[offset:offset + 4 * length].cast(code))
+            offset += 4 * length
+        self.scores, self.order, keys, self.key_starts, self.postings = arrays
+        self.keys = {chr(code): i for i, code in enumerate(keys)}
+
+    def _build(self, stat):
+        corpus = self.corpus
+        char_counts = Counter()
+        for text in corpus.passages():
+            char_counts.update(text)
+        scorer = DifficultyScorer(char_counts)
+
+        scores = array('f')
+        heaps = {char: [] for char in char_counts if not char.isspace() and char == char.lower()}
+        for i, text in enumerate(corpus.passages()):
+            counts = Counter(text)
+            scores.append(scorer.score(text, counts))
+            length = len(text)
+            lower = text.lower()
+            for char, n in (counts if lower == text else Counter(lower)).items():
+                heap = heaps.get(char)
+                if heap is None:
+                    continue
+                if len(heap) < PASSAGES_PER_KEY:
+                    heapq.heappush(heap, (n / length, i))
+                elif n / length > heap[0][0]:
+                    heapq.heapreplace(heap, (n / length, i))
+
+        order = array('I', sorted(range(len(scores)), key=scores.__getitem__))
+        keys = array('I', (ord(char) for char in heaps))
+        key_starts = array('I', [0])
+        postings = array('I')
+        for heap in heaps.values():
+            postings.extend(i for _, i in sorted(heap, reverse=True))
+            key_starts.append(len(postings))
+
+        data = bytearray(DIFFICULTY_HEADER.pack(DIFFICULTY_MAGIC, stat.st_size, stat.st_mtime_ns,
+                                                len(scores), len(keys), len(postings)))
+        for part in (scores, order, keys, key_starts, postings):
+            data += part.tobytes()
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not cache difficulty index: {e}")
+        self._load(memoryview(data), len(scores), len(keys), len(postings))
+
+    def sample_band(self, low, high, rng=random):
+        """A passage ranked between percentiles low and high (0 easiest, 1 hardest)"""
+        count = len(self.order)
+        start = min(int(low * count), count - 1)
+        end = max(min(int(math.ceil(high * count)), count), start + 1)
+        return self.order[rng.randrange(start, end)]
+
+    def sample_weak_keys(self, weights, rng=random):
+        """A passage dense in one of the weak keys, picked in proportion to its
+        weight; None if no key in the profile appears in the corpus"""
+        candidates = [(self.keys[key.lower()], weight) for key, weight in weights.items()
+                      if weight > 0 and key.lower() in self.keys]
+        candidates = [(k, weight) for k, weight in candidates if self.key_starts[k + 1] > self.key_starts[k]]
+        if not candidates:
+            return None
+        k = rng.choices([k for k, _ in candidates], [weight for _, weight in candidates])[0]
+        return self.postings[rng.randrange(self.key_starts[k], self.key_starts[k + 1])]
+
+    def close(self):
+        for view in (self.scores, self.order, self.key_starts, self.postings):
+            view.release()
+        if self._mapping is not None:
+            self._mapping.close()
+
@@ -0,0 +1,200 @@
+"""Headless scoring for the typing test.
+
+`TypingTracker` keeps what has been typed so far against a passage,
+with a running count of correct characters. Each edit (`replace`) only
+re-examines positions from the edit on, so typing or deleting at the
+end costs O(1) however long the passage is; a paste or an edit in the
+middle costs the length of the text after it, since every later
+position may now line up differently. The changed span is
+returned so a view can retag just those characters.
+
+The tracker also keeps, across passages, how often each key was
+attempted and missed while typing forward; `weak_keys` turns that into
+the profile typing_corpus.DifficultyIndex picks practice passages by.
+
+`keystrokes` turns an edit into per-character events, and
+`TypingAnalytics` keeps rolling speed and error figures over them: for
+each window a deque of the keystrokes inside it with running counts,
+so each keystroke is O(1) amortized, however long the test runs.
+Pasted text is left out of them.
+"""
+from collections import Counter, deque, namedtuple
+
+CORRECT = 'correct'
+WRONG = 'wrong'
+
+# Keystroke kinds
+TYPED = 0
+DELETED = 1
+
+WINDOWS = (5, 15, 60)  # seconds of rolling statistics; the shortest also measures bursts
+CHARS_PER_WORD = 5
+MIN_ELAPSED_NS = 1_000_000_000  # so the first few keystrokes don't read as thousands of WPM
+
+WindowStats = namedtuple('WindowStats', 'raw_wpm net_wpm error_rate')
+
+
+def keystrokes(sample, start, removed, inserted):
+    """(kind, position, character, correct) for each character of an edit
+    at start that replaced removed with inserted: removals last first,
+    then insertions"""
+    for i in range(start + len(removed) - 1, start - 1, -1):
+        yield DELETED, i, removed[i - start], False
+    for i, char in enumerate(inserted, start):
+        yield TYPED, i, char, i < len(sample) and char == sample[i]
+
+
+class TypingTracker:
+    def __init__(self, sample=""):
+        self.key_attempts = Counter()  # passage character -> times typed
+        self.key_errors = Counter()    # passage character -> times mistyped
+        self.reset(sample)
+
+    def reset(self, sample):
+        self.sample = sample
+        self.chars = []   # the typed text, a character per item so edits at the end are O(1)
+        self.correct = 0  # typed characters matching the passage
+
+    def is_correct(self, i):
+        return i < len(self.sample) and self.chars[i] == self.sample[i]
+
+    def _count_correct(self, text, start, end):
+        sample = self.sample
+        return sum(1 for i in range(start, min(end, len(sample))) if text[i] == sample[i])
+
+    def replace(self, start, end, text):
+        """Replace the typed characters in [start, end) with text; returns
+        (start, old_end, new_end), the span that changed in the old and new
+        text"""
+        chars = self.chars
+        old_end = len(chars)
+        self.correct -= self._count_correct(chars, start, old_end)
+        chars[start:end] = text
+        self.correct += self._count_correct(chars, start, len(chars))
+        if start == old_end:
+            self._count_keys(start, len(chars))
+        return start, old_end, len(chars)
+
+    def _count_keys(self, start, end):
+        """Record attempts at the passage characters typed in [start, end)"""
+        sample = self.sample
+        for i in range(start, min(end, len(sample))):
+            self.key_attempts[sample[i]] += 1
+            if self.chars[i] != sample[i]:
+                self.key_errors[sample[i]] += 1
+
+    def weak_keys(self):
+        """Error rate of each key missed at least once"""
+        return {key: errors / self.key_attempts[key] for key, errors in self.key_errors.items()
+                if not key.isspace()}
+
+    def runs(self, start, end):
+        """(tag, start, end) for each run of equally scored passage
+        positions in [start, end)"""
+        end = min(end, len(self.chars), len(self.sample))
+        i = start
+        while i < end:
+            tag = CORRECT if self.is_correct(i) else WRONG
+            j = i + 1
+            while j < end and (CORRECT if self.is_correct(j) else WRONG) == tag:
+                j += 1
+            yield tag, i, j
+            i = j
+
+    @property
+    def typed(self):
+        return ''.join(self.chars)
+
+    @property
+    def cursor(self):
+        """Passage position of the next character to type"""
+        return len(self.chars)
+
+    @property
+    def complete(self):
+        return self.correct == len(self.sample) == len(self.chars)
+
+    @property
+    def accuracy(self):
+        """Percentage of typed characters that are correct"""
+        return self.correct / len(self.chars) * 100 if self.chars else 100
+
+
+class SlidingWindow:
+    """Typed keystrokes in the last `seconds`, with running counts"""
+    def __init__(self, seconds):
+        self.span = round(seconds * 1e9)
+        self.events = deque()  # (timestamp ns, correct)
+        self.typed = 0
+        self.correct = 0
+
+    def add(self, timestamp, correct):
+        self.events.append((timestamp, correct))
+        self.typed += 1
+        self.correct += correct
+
+    def expire(self, now):
+        events = self.events
+        cutoff = now - self.span
+        while events and events[0][0] <= cutoff:
+            _, correct = events.popleft()
+            self.typed -= 1
+            self.correct -= correct
+
+    def clear(self):
+        self.events.clear()
+        self.typed = self.correct = 0
+
+
+def words_per_minute(chars, elapsed_ns):
+    return chars / CHARS_PER_WORD / (elapsed_ns / 60e9)
+
+
+class TypingAnalytics:
+    """Rolling raw and net WPM, error rate and burst speed of one test,
+    fed keystrokes with perf_counter_ns timestamps"""
+    def __init__(self, windows=WINDOWS):
+        self.windows = {seconds: SlidingWindow(seconds) for seconds in sorted(windows)}
+        self.reset()
+
+    def reset(self):
+        for window in self.windows.values():
+            window.clear()
+        self.started = None  # timestamp of the first keystroke
+        self.burst = 0.0     # best net WPM over a full shortest window
+
+    def keystroke(self, timestamp, kind, correct):
+        if kind != TYPED:
+            return  # a deletion costs time, which the windows already show
+        if self.started is None:
+            self.started = timestamp
+        for window in self.windows.values():
+            window.expire(timestamp)
+            window.add(timestamp, correct)
+        shortest = next(iter(self.windows.values()))
+        if timestamp - self.started >= shortest.span:
+            self.burst = max(self.burst, words_per_minute(shortest.correct, shortest.span))
+
+    def edit(self, timestamp, events):
+        """Take the keystrokes of one edit. One that types several characters
+        at once is a paste, which says nothing about typing speed, so it is
+        left out of the figures"""
+        typed = [correct for kind, _, _, correct in events if kind == TYPED]
+        if len(typed) == 1:
+            self.keystroke(timestamp, TYPED, typed[0])
+
+    def stats(self, now):
+        """{window seconds: WindowStats} as of now; a window longer than the
+        test so far covers just the test"""
+        stats = {}
+        for seconds, window in self.windows.items():
+            window.expire(now)
+            if self.started is None:
+                stats[seconds] = WindowStats(0.0, 0.0, 0.0)
+                continue
+            elapsed = max(min(window.span, now - self.started), MIN_ELAPSED_NS)
+            stats[seconds] = WindowStats(
+                words_per_minute(window.typed, elapsed), words_per_minute(window.correct, elapsed),
+                (window.typed - window.correct) / window.typed if window.typed else 0.0
+            )
+        return stats
@@ -0,0 +1,206 @@
+"""Keystroke log for the typing test.
+
+Every edit to the typing box becomes one event per character typed or
+deleted, stamped with time.perf_counter_ns() as it arrives: passage
+position, character, whether it matched the passage. Events are packed
+into a preallocated ring buffer of fixed-size records, and a background
+thread drains it to an append-only session file in batches, so the
+keystroke path never touches the disk. If the writer falls a whole
+buffer behind, new events are dropped and counted rather than holding
+up typing. The file is only created once something has been typed.
+
+A session file is a header (magic, then the wall clock and perf_counter
+readings at the start, in ns) followed by the records, little-endian.
+Per-key latency and per-bigram speed over any number of sessions:
+
+    python typing_keylog.py ~/.typing/keylogs
+"""
+import argparse
+import os
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from typing_engine import TYPED
+
+DEFAULT_KEYLOG_DIR = os.path.join(os.path.expanduser("~"), ".typing", "keylogs")
+EXTENSION = '.tks'
+
+MAGIC = b'TKS1'
+HEADER = struct.Struct('<4sqq')   # magic, wall clock ns, perf_counter ns
+RECORD = struct.Struct('<qIIBB')  # perf_counter ns, position, character, kind, correct
+
+# Event kinds besides typing_engine.TYPED and DELETED
+PASSAGE = 2  # a new passage; position is its length
+
+# Longer gaps between keystrokes are pauses, not typing speed
+PAUSE_NS = 2_000_000_000
+
+Event = namedtuple('Event', 'time position char kind correct')
+Session = namedtuple('Session', 'wall_clock_ns origin_ns events')
+
+
+class KeyLog:
+    def __init__(self, directory=DEFAULT_KEYLOG_DIR, capacity=4096, flush_interval=1.0):
+        wall_clock_ns = time.time_ns()
+        started = time.strftime('%Y%m%d-%H%M%S', time.localtime(wall_clock_ns // 10**9))
+        self.path = os.path.join(directory, f"session-{started}-{wall_clock_ns % 10**9:09d}{EXTENSION}")
+        self.header = HEADER.pack(MAGIC, wall_clock_ns, time.perf_counter_ns())
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.head = 0  # events recorded; only the keystroke thread moves it
+        self.tail = 0  # events written; only the writer moves it
+        self.dropped = 0
+        self.flush_interval = flush_interval
+        self._passage = None  # a new passage's event, logged with its first keystroke
+        self._file = None
+        self._failed = False
+        self._closing = False
+        self._wake = threading.Event()
+        self._writer = threading.Thread(target=self._run, name="keylog-writer", daemon=True)
+        self._writer.start()
+
+    def _record(self, timestamp, position, code, kind, correct):
+        head = self.head
+        if head - self.tail >= self.capacity:
+            self.dropped += 1
+            return
+        RECORD.pack_into(self.buffer, head % self.capacity * RECORD.size, timestamp, position, code, kind, correct)
+        self.head = head + 1
+        if head + 1 - self.tail >= self.capacity // 2:
+            self._wake.set()
+
+    def passage(self, timestamp, sample):
+        self._passage = (timestamp, len(sample), 0, PASSAGE, False)
+
+    def keystroke(self, timestamp, kind, position, char, correct):
+        """Log one of typing_engine.keystrokes"""
+        if self._passage is not None:
+            self._record(*self._passage)
+            self._passage = None
+        self._record(timestamp, position, ord(char), kind, correct)
+
+    def _open(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'ab')
+            self._file.write(self.header)
+        except OSError as e:
+            print(f"Could not open keystroke log: {e}")
+            self._file = None
+            self._failed = True
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closing
+            self._drain()
+            if closing:
+                break
+        if self._file is not None:
+            self._file.close()
+
+    def _drain(self):
+        head, tail = self.head, self.tail
+        if head == tail:
+            return
+        view = memoryview(self.buffer)
+        start = tail % self.capacity * RECORD.size
+        end = head % self.capacity * RECORD.size
+        chunks = (view[start:end],) if start < end else (view[start:], view[:end])
+        if self._file is None and not self._failed:
+            self._open()
+        if self._file is not None:
+            try:
+                for chunk in chunks:
+                    self._file.write(chunk)
+                self._file.flush()
+            except OSError as e:
+                # Keep draining so typing never stalls, but stop writing
+                print(f"Could not write keystroke log: {e}")
+                self._file.close()
+                self._file = None
+                self._failed = True
+        self.tail = head
+
+    def close(self):
+        """Write out everything logged so far and stop the writer"""
+        self._closing = True
+        self._wake.set()
+        self._writer.join()
+        if self.dropped:
+            print(f"Keystroke log fell behind and dropped {self.dropped} events")
+
+
+def session_paths(path):
+    """A session file, or the sessions in a directory"""
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(EXTENSION))
+    return [path]
+
+
+def read_session(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated keystroke log.")
+    magic, wall_clock_ns, origin_ns = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"Not a keystroke log: {magic!r}")
+    # A session cut short can end in part of a record
+    end = HEADER.size + (len(data) - HEADER.size) // RECORD.size * RECORD.size
+    events = [Event(timestamp, position, chr(code), kind, bool(correct))
+              for timestamp, position, code, kind, correct in RECORD.iter_unpack(data[HEADER.size:end])]
+    return Session(wall_clock_ns, origin_ns, events)
+
+
+def keystroke_intervals(events):
+    """(previous character, character, ns) for each correct keystroke typed
+    straight after another correct one"""
+    previous = None
+    for event in events:
+        if event.kind == TYPED and event.correct and previous is not None \
+                and previous.kind == TYPED and previous.correct:
+            interval = event.time - previous.time
+            if 0 < interval <= PAUSE_NS:  # zero is a paste
+                yield previous.char, event.char, interval
+        previous = event
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-key latency and bigram speed from typing test keystroke logs")
+    parser.add_argument('paths', nargs='+', help="session files or directories of them")
+    parser.add_argument('--top', type=int, default=15, help="slowest bigrams to list")
+    parser.add_argument('--min-count', type=int, default=3, help="ignore bigrams typed fewer times")
+    args = parser.parse_args(argv)
+
+    keys = defaultdict(list)
+    bigrams = defaultdict(list)
+    for path in (path for arg in args.paths for path in session_paths(arg)):
+        try:
+            events = read_session(path).events
+        except (OSError, ValueError) as e:
+            print(f"{path}\n    Could not read keystroke log: {e}")
+            continue
+        for previous, char, interval in keystroke_intervals(events):
+            keys[char].append(interval)
+            bigrams[previous + char].append(interval)
+
+    def mean_ms(intervals):
+        return sum(intervals) / len(intervals) / 1e6
+
+    print("key   mean ms  count")
+    for char, intervals in sorted(keys.items(), key=lambda item: -mean_ms(item[1])):
+        print(f"{char!r:5} {mean_ms(intervals):7.1f}  {len(intervals):5}")
+    print("\nslowest bigrams")
+    common = [(pair, intervals) for pair, intervals in bigrams.items() if len(intervals) >= args.min_count]
+    for pair, intervals in sorted(common, key=lambda item: -mean_ms(item[1]))[:args.top]:
+        print(f"{pair!r:6} {mean_ms(intervals):7.1f}  {len(intervals):5}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
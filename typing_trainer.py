@@ -3,15 +3,25 @@
 
 import tkinter as tk
 from tkinter import ttk
-import random
+import os
+import threading
 import time
 
-# Sample texts (you can add hundreds more or load from a file)
-with open('sample_texts.txt','r', errors='ignore') as f:
-    SAMPLE_TEXTS = f.readlines()
+from typing_corpus import Corpus, DifficultyIndex
+from typing_engine import CORRECT, WRONG, TypingAnalytics, TypingTracker, keystrokes
+from typing_keylog import DEFAULT_KEYLOG_DIR, KeyLog
+
+# Sample texts, one per line (add hundreds more, or point at any corpus file)
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_texts.txt')
+
+# Passage difficulty percentiles for each level
+DIFFICULTY_BANDS = {"Easy": (0, 1 / 3), "Medium": (1 / 3, 2 / 3), "Hard": (2 / 3, 1)}
+DIFFICULTY_CHOICES = ("Any", *DIFFICULTY_BANDS, "Weak keys")
+
+STATS_MS = 200  # how often the speed figures are redrawn while typing
 
 class TypingTest:
-    def __init__(self, root):
+    def __init__(self, root, corpus_path=DEFAULT_CORPUS, keylog_dir=DEFAULT_KEYLOG_DIR):
         self.root = root
         self.root.title("Typing Speed Test")
         self.root.geometry("800x600")
@@ -21,6 +31,15 @@ class TypingTest:
         self.time_left = 60
         self.start_time = None
         self.timer_running = False
+        self.tracker = TypingTracker()
+        self.analytics = TypingAnalytics()
+        self.stats_job = None
+        self.label_text = {}  # label -> text it shows, to skip redundant redraws
+        self.corpus = Corpus(corpus_path)
+        self.difficulty_index = None  # scored in the background; random passages until then
+        self.indexer = threading.Thread(target=self.load_difficulty_index, name="difficulty-index", daemon=True)
+        self.indexer.start()
+        self.keylog = KeyLog(keylog_dir) if keylog_dir is not None else None
 
         self.style = ttk.Style()
         self.style.theme_use("clam")
@@ -33,21 +52,26 @@ class TypingTest:
         title = tk.Label(self.root, text="Typing Speed Test", font=("Helvetica", 28, "bold"), bg="#f0f0f0", fg="#333")
         title.pack(pady=(20, 10))
 
-        # Sample text display
-        self.sample_label = tk.Label(
+        # Sample text display: a read-only Text, so typed characters can be tagged
+        self.sample_display = tk.Text(
             self.root,
-            text="",
             font=("Consolas", 18),
             bg="#ffffff",
             fg="#333",
-            wraplength=750,
-            justify="left",
+            width=60,
+            height=3,
+            wrap="word",
             relief="solid",
             borderwidth=2,
             padx=15,
             pady=15,
+            cursor="arrow",
+            takefocus=0,
         )
-        self.sample_label.pack(pady=10)
+        self.sample_display.tag_config(CORRECT, foreground="#2e8b57")
+        self.sample_display.tag_config(WRONG, foreground="#e74c3c", underline=True)
+        self.sample_display.tag_config("cursor", background="#ffe58a")
+        self.sample_display.pack(pady=10)
 
         # Entry
         self.entry = tk.Text(
@@ -75,6 +99,9 @@ class TypingTest:
         self.time_label = tk.Label(stats_frame, text="Time: 60s", font=("Helvetica", 16), bg="#f0f0f0", fg="red")
         self.time_label.pack(side="left", padx=20)
 
+        self.detail_label = tk.Label(self.root, text="", font=("Helvetica", 12), bg="#f0f0f0", fg="#555")
+        self.detail_label.pack()
+
         # Buttons
         btn_frame = tk.Frame(self.root, bg="#f0f0f0")
         btn_frame.pack(pady=20)
@@ -82,33 +109,70 @@ class TypingTest:
         self.start_btn = ttk.Button(btn_frame, text="Start / Reset", command=self.new_test)
         self.start_btn.pack(side="left", padx=10)
 
-        # Bind events
-        self.entry.bind("<KeyRelease>", self.on_type)
+        self.difficulty = tk.StringVar(value="Any")
+        difficulty_box = ttk.Combobox(
+            btn_frame, textvariable=self.difficulty, values=DIFFICULTY_CHOICES, state="readonly", width=10
+        )
+        difficulty_box.pack(side="left", padx=10)
+        difficulty_box.bind("<<ComboboxSelected>>", lambda event: self.new_test())
+
+        # Every edit, pastes and undo included, goes through the entry's
+        # widget command; wrap it to see where each one lands and what it
+        # inserts or removes, without reading back the whole text
+        self.entry_command = str(self.entry) + "_edits"
+        self.entry.tk.call("rename", str(self.entry), self.entry_command)
+        self.entry.tk.createcommand(str(self.entry), self.on_entry_command)
 
     def new_test(self):
-        self.sample_text = random.choice(SAMPLE_TEXTS)
-        self.sample_label.config(text=self.sample_text)
+        self.sample_text = self.pick_passage()
+        self.tracker.reset(self.sample_text)
+        self.analytics.reset()
+        if self.keylog is not None:
+            self.keylog.passage(time.perf_counter_ns(), self.sample_text)
+        self.sample_display.config(state="normal")
+        self.sample_display.delete("1.0", "end")
+        self.sample_display.insert("1.0", self.sample_text)
+        self.sample_display.config(state="disabled")
+        self.move_cursor(0)
 
-        self.entry.delete("1.0", "end")
         self.entry.config(state="normal")
+        self.entry.tk.call(self.entry_command, "delete", "1.0", "end")  # not an edit to track
 
         self.time_left = 60
         self.timer_running = False
         self.start_time = None
+        if self.stats_job is not None:
+            self.root.after_cancel(self.stats_job)
+            self.stats_job = None
 
         self.time_label.config(text="Time: 60s", fg="red")
-        self.wpm_label.config(text="WPM: 0")
-        self.accuracy_label.config(text="Accuracy: 100%")
-
-        # Highlighting reset
-        self.sample_label.config(fg="#333")
+        self.render_stats()
         self.entry.focus()
 
+    def load_difficulty_index(self):
+        """Open the corpus's difficulty index, scoring every passage the
+        first time, off the Tk thread"""
+        try:
+            self.difficulty_index = DifficultyIndex(self.corpus)
+        except (OSError, ValueError) as e:
+            print(f"Could not index passage difficulty: {e}")
+
+    def pick_passage(self):
+        level = self.difficulty.get()
+        if level == "Any" or self.difficulty_index is None:
+            return self.corpus.random_passage()
+        if level == "Weak keys":
+            # Until some keys have been missed, any passage will do
+            i = self.difficulty_index.sample_weak_keys(self.tracker.weak_keys())
+            return self.corpus.random_passage() if i is None else self.corpus.passage(i)
+        return self.corpus.passage(self.difficulty_index.sample_band(*DIFFICULTY_BANDS[level]))
+
     def start_timer(self):
         if not self.timer_running:
             self.timer_running = True
             self.start_time = time.time()
             self.update_timer()
+            self.stats_job = self.root.after(STATS_MS, self.refresh_stats)
 
     def update_timer(self):
         if self.timer_running and self.time_left > 0:
@@ -119,52 +183,100 @@ class TypingTest:
             else:
                 self.root.after(1000, self.update_timer)
 
-    def on_type(self, event=None):
-        if not self.timer_running and len(self.entry.get("1.0", "end").strip()) > 0:
+    def on_entry_command(self, operation, *args):
+        """The entry's widget command: runs the real one, and passes each
+        insert or delete on to on_edit as (start, end, text) offsets"""
+        call = self.entry.tk.call
+        if operation not in ("insert", "delete") or str(call(self.entry_command, "cget", "-state")) != "normal":
+            return call(self.entry_command, operation, *args)
+        now = time.perf_counter_ns()
+        length = self.tracker.cursor
+        start = min(self.entry_offset(args[0]), length)
+        if operation == "insert":
+            end = start
+            text = "".join(args[1::2])  # insert index chars ?tags chars tags ...?
+        else:
+            end = self.entry_offset(args[1]) if len(args) > 1 else start + 1
+            end = min(max(end, start), length)
+            text = ""
+        result = call(self.entry_command, operation, *args)
+        if start != end or text:
+            self.on_edit(now, start, end, text)
+        return result
+
+    def entry_offset(self, index):
+        """Characters before a text index of the entry"""
+        return int(self.entry.tk.call(self.entry_command, "count", "-chars", "1.0", index) or 0)
+
+    def on_edit(self, now, start, end, text):
+        if not self.timer_running and text.strip():
             self.start_timer()
 
-        typed = self.entry.get("1.0", "end-1c")
-        self.update_highlighting(typed)
-        self.update_stats(typed)
+        removed = self.tracker.chars[start:end]
+        span = self.tracker.replace(start, end, text)
+        events = list(keystrokes(self.sample_text, start, removed, text))
+        self.analytics.edit(now, events)
+        if self.keylog is not None:
+            for kind, position, char, correct in events:
+                self.keylog.keystroke(now, kind, position, char, correct)
+        self.update_highlighting(*span)
 
         # End test if sample is fully typed correctly
-        if typed == self.sample_text:
+        if self.tracker.complete:
             self.end_test()
 
-    def update_highlighting(self, typed):
-        self.sample_label.tag_remove("correct", "1.0", "end")
-        self.sample_label.tag_remove("wrong", "1.0", "end")
-
-        for i, char in enumerate(typed):
-            if i < len(self.sample_text) and char == self.sample_text[i]:
-                self.sample_label.tag_add("correct", f"1.{i}", f"1.{i+1}")
-            elif i < len(self.sample_text):
-                self.sample_label.tag_add("wrong", f"1.{i}", f"1.{i+1}")
-
-        self.sample_label.tag_config("correct", foreground="#2e8b57")
-        self.sample_label.tag_config("wrong", foreground="#e74c3c", underline=True)
-
-    def update_stats(self, typed):
-        if self.start_time is None:
-            return
-
-        elapsed = max(time.time() - self.start_time, 0.01)
-        words_typed = len(typed.split())
-        wpm = int((words_typed / elapsed) * 60)
-
-        # Accuracy
-        correct_chars = sum(1 for i, c in enumerate(typed) if i < len(self.sample_text) and c == self.sample_text[i])
-        accuracy = (correct_chars / len(typed) * 100) if typed else 100
-
-        self.wpm_label.config(text=f"WPM: {wpm}")
-        self.accuracy_label.config(text=f"Accuracy: {accuracy:.1f}%")
+    def update_highlighting(self, start, old_end, new_end):
+        """Retag only the passage characters whose score may have changed"""
+        display = self.sample_display
+        if start < min(old_end, len(self.sample_text)):
+            display.tag_remove(CORRECT, f"1.0+{start}c", f"1.0+{old_end}c")
+            display.tag_remove(WRONG, f"1.0+{start}c", f"1.0+{old_end}c")
+        for tag, run_start, run_end in self.tracker.runs(start, new_end):
+            display.tag_add(tag, f"1.0+{run_start}c", f"1.0+{run_end}c")
+        if old_end != new_end:
+            self.move_cursor(new_end)
+
+    def move_cursor(self, position):
+        self.sample_display.tag_remove("cursor", "1.0", "end")
+        if position < len(self.sample_text):
+            self.sample_display.tag_add("cursor", f"1.0+{position}c")
+        # Long passages wrap past the visible lines; keep the cursor in view
+        self.sample_display.see(f"1.0+{position}c")
+
+    def refresh_stats(self):
+        self.render_stats()
+        if self.timer_running:
+            self.stats_job = self.root.after(STATS_MS, self.refresh_stats)
+        else:
+            self.stats_job = None
+
+    def render_stats(self):
+        stats = self.analytics.stats(time.perf_counter_ns())
+        windows = sorted(stats)
+        overall = stats[windows[-1]]
+        self.set_label(self.wpm_label, f"WPM: {overall.net_wpm:.0f}")
+        self.set_label(self.accuracy_label, f"Accuracy: {self.tracker.accuracy:.1f}%")
+        rolling = "  ".join(f"{seconds}s: {stats[seconds].net_wpm:.0f}" for seconds in windows)
+        self.set_label(self.detail_label, f"Net WPM {rolling}    Raw {overall.raw_wpm:.0f}"
+                                          f"    Errors {overall.error_rate:.1%}    Burst {self.analytics.burst:.0f}")
+
+    def set_label(self, label, text):
+        if self.label_text.get(label) != text:
+            self.label_text[label] = text
+            label.config(text=text)
 
     def end_test(self):
         self.timer_running = False
         self.entry.config(state="disabled")
+        self.render_stats()
         self.time_label.config(text="Time's up!", fg="#e74c3c")
 
+    def close(self):
+        if self.keylog is not None:
+            self.keylog.close()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = TypingTest(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.close()
\ No newline at end of file